@@ -4,12 +4,11 @@ Compares classic Linearized Bregman to modified Linearized Bregman
 @date: June 6th, 2019
 """
 import numpy as np
-import numpy.random as random
 import numpy.linalg as la
-np.random.seed(0)
 
 import init_problem as init
 import plot
+import shrinkage
 
 def get_residual(A, x, y):
     residual = np.dot(A, x) - y
@@ -19,7 +18,7 @@ def get_gradient(A, residual):
     gradient = np.dot(A.T, residual)
     return gradient
 
-def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False):
+def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False, seed=0):
     """
     Compares classic LB to modified LB
     params:
@@ -31,7 +30,8 @@ def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False):
     """
     # ------ SETTING PARAMETERS ------
     # initializes the Ax = y problem 
-    problem = init.init_l1(m, n, num_samp, max_iter, sparse, noise)
+    problem = init.init_l1(m, n, num_samp, max_iter, sparse, noise, seed=seed)
+    rng = np.random.default_rng(seed)
     A = problem[0]
     x_true = problem[1]
     y = problem[2]
@@ -49,9 +49,6 @@ def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False):
     lambda_lb = 4.0;
     m_flag = np.zeros((1, n), dtype=int)
     
-    # thresholding function 
-    S = lambda x, lmda: np.multiply(np.maximum(np.absolute(x) - lmda, 0), np.sign(x))
-    
     # arrays to hold results 
     residual = np.zeros((max_iter, 3), dtype=float)
     onenorm = np.zeros((max_iter, 3), dtype=float)
@@ -69,7 +66,7 @@ def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False):
         
         # ------ SAMPLING ------
         # choosing random rows of A
-        idx = random.permutation(n)
+        idx = rng.permutation(n)
 
         # getting the corresponding rows of A and y
         A_sub = A[idx[:num_samp], :]
@@ -130,7 +127,7 @@ def lb_compare(m, n, num_samp, max_iter, sparse=True, noise=False):
         step_size = (t_lb[2]*np.absolute(t_k_new2)/i).T
         z_lb[:, 2] = z_lb[:, 2] - np.multiply(step_size, g_lb[:, 2])
         
-        x_lb[:, :] = S(z_lb[:, :], lambda_lb)
+        shrinkage.soft_threshold(z_lb, lambda_lb, out=x_lb)
         
         # ------ RESULTS ------
         residual[i-1, 0] = la.norm(get_residual(A_sub, x_lb[:, 0], y_sub), 2) / la.norm(y_sub, 2)
@@ -0,0 +1,35 @@
+"""
+Executes accelerated Linearized Bregman (Nesterov momentum on z)
+@authors: Jimmy Singh and Janice Lee
+@date: July 25th, 2019
+"""
+import set_params
+import solver
+import plot
+
+def accelerated_lb(params, problem=None):
+    """
+    Executes accelerated Linearized Bregman
+    params:
+        params (Params object): contains parameters for optimization
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem
+    returns:
+        results (Results object): contains the arrays
+                with the results of the optimization
+    """
+    rule = solver.AcceleratedStep(params, solver.ClassicStep(params))
+    return solver.solve(params, rule, thresholding=True, problem=problem)
+
+def main():
+    # ------ CONFIGURE PARAMETERS ------
+    params = set_params.Params()
+    # ------ EXECUTE ------
+    results = accelerated_lb(params)
+    # ------ PLOT ------
+    algorithm = "accelerated-lb"
+    plt = plot.Plot(params)
+    plt.update_algorithm(algorithm, results, thresholding=True)
+    plt.plot_all()
+
+if __name__ == "__main__":
+    main()
@@ -1,111 +1,35 @@
-"""
-Executes ADAGRAD (Adaptive Gradient Descent)
-@authors: Jimmy Singh and Janice Lee
-@date: June 21st, 2019
-"""
-import numpy as np
-import numpy.random as random
-import numpy.linalg as la
-np.random.seed(0)
-
-import set_params
-import init_problem as init 
-import get_results
-import plot
-
-def adagrad(params):
-    """
-    Executes ADAGRAD  
-    params:
-        params (Params object): contains parameters for optimization 
-    returns:
-        results (array-like): a tuple containing the arrays 
-                with the results of the optimization
-    """
-    # ------ PARAMETERS ------
-    m = params.m         
-    n = params.n         
-    num_samp = params.num_samp    
-    max_iter = params.max_iter
-    
-    eta = params.eta
-    epsilon = params.epsilon
-    
-    sparse = params.sparse 
-    noise = params.noise
-    # ------------------------
-    # initializes the Ax = b problem 
-    problem = init.init_l1(m, n, num_samp, max_iter, sparse, noise)
-    A = problem[0]
-    x_true = problem[1]
-    b = problem[2]
-    
-    # the cumulative sum of the squared gradient 
-    s_k = np.zeros((n, 1))
-    # the step size ( eta/sqrt(s_k + epsilon) )
-    t_k = np.zeros((n, 1))
-    # the estimation of x_true 
-    x_k = np.zeros((n, 1))
-    
-    # creates a Results object to hold and update results 
-    results = get_results.Results(max_iter, n, x_true)
-    
-    for i in range(1, max_iter+1):
-        print("iteration: " + str(i))
-        
-        # ------ SAMPLING ------
-        # chooses random rows
-        idx = random.permutation(n)
-        # gets corresponding rows of A and b 
-        A_sub = A[idx[:num_samp], :]
-        b_sub = b[idx[:num_samp]]
-        
-        # ------ RESIDUAL AND GRADIENT ------
-        # gets the residual ( Ax - b )
-        residual = np.dot(A_sub, x_k) - b_sub
-        # gets the gradient ( A.T * residual )
-        gradient = np.dot(A_sub.T, residual)
-        
-        # ------ STEP SIZE ------
-        s_k = s_k + np.multiply(gradient, gradient)
-        t_k = eta / np.sqrt(s_k + epsilon) 
-        
-        # ------ UPDATING X ------
-        x_k = x_k - np.multiply(t_k, gradient)
-        
-        # ------ RESULTS ------
-        results.update_iteration()
-        results.update_residuals(residual, b_sub)
-        results.update_onenorm(x_k)
-        results.update_moder(x_true, x_k)
-        results.update_x_history(x_k, n)
-        results.update(residual, b_sub, n, x_k, np.zeros((n, 1)), t_k, adaptive=True)
-        
-    return results
-    
-def main(): 
-    # ------ CONFIGURE PARAMETERS ------
-    params = set_params.Params()
-    # ------ EXECUTE ------
-    results = adagrad(params)
-    # ------ PLOT ------
-    algorithm = "adagrad"
-    plt = plot.Plot(params)
-    plt.update_algorithm(algorithm, results, thresholding=True)
-    plt.plot_all()
-    
-if __name__ == "__main__":
-    main()
-        
-        
-        
-        
-        
-        
-        
-        
-        
-    
-    
-    
-    
+"""
+Executes ADAGRAD (Adaptive Gradient Descent)
+@authors: Jimmy Singh and Janice Lee
+@date: June 21st, 2019
+"""
+import set_params
+import solver
+import plot
+
+def adagrad(params, problem=None):
+    """
+    Executes ADAGRAD  
+    params:
+        params (Params object): contains parameters for optimization 
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem
+    returns:
+        results (Results object): contains the arrays 
+                with the results of the optimization
+    """
+    rule = solver.AdagradStep(params)
+    return solver.solve(params, rule, thresholding=False, problem=problem)
+    
+def main(): 
+    # ------ CONFIGURE PARAMETERS ------
+    params = set_params.Params()
+    # ------ EXECUTE ------
+    results = adagrad(params)
+    # ------ PLOT ------
+    algorithm = "adagrad"
+    plt = plot.Plot(params)
+    plt.update_algorithm(algorithm, results, thresholding=True)
+    plt.plot_all()
+    
+if __name__ == "__main__":
+    main()
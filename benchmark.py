@@ -0,0 +1,212 @@
+"""
+Benchmarks every solver over a grid of problem sizes, saving the results as JSON
+usage:
+    python benchmark.py [--iters N] [--repeat R] [--out results.json]
+    python benchmark.py compare old.json new.json
+@authors: Jimmy Singh and Janice Lee
+@date: July 21st, 2019
+"""
+import argparse
+import copy
+import json
+import multiprocessing as mp
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import set_params
+import solver
+import sweep
+from ista import ista
+
+# the solvers of sweep.py, plus the variants with flipping and ISTA
+BENCHMARKS = ["lb-classic", "lb-modified", "lb-modified-w-flipping",
+              "adagrad", "adagrad-lb-classic", "adagrad-lb-modified", "adagrad-lb-modified-w-flipping",
+              "adam", "adam-lb-classic", "adam-lb-modified", "adam-lb-modified-w-flipping",
+              "accelerated-lb", "fista", "svrg-lb-classic", "svrg-lb-modified",
+              "saga-lb-classic", "saga-lb-modified", "ista"]
+
+# the problems to benchmark on (see sweep.expand)
+GRID = {
+    "m": [20000, 50000],
+    "n": [1000, 2000],
+    "num_samp": [100, 200],
+    "sparse": [True, False],
+}
+
+class AllocationProfiler:
+    """
+    Profiler (see profiler.py) that measures, with tracemalloc, the most memory
+    allocated above the start of each iteration
+    """
+    def __init__(self):
+        self.peaks = []
+        self.current = 0
+
+    def begin(self, i):
+        self.current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.peaks.append(0)
+
+    def mark(self, phase):
+        self.peaks[-1] = tracemalloc.get_traced_memory()[1] - self.current
+
+def run_algorithm(algorithm, params, problem, profile=None):
+    """
+    Runs one algorithm on a problem without printing
+    """
+    params = copy.copy(params)
+    params.verbose = False
+    params.profile = profile
+    if (algorithm == "ista"):
+        return ista(params.m, params.n, params.num_samp, params.max_iter, params.lmbda,
+                    problem=problem, verbose=False, profile=profile,
+                    stop_moder=params.stop_moder, stop_residual=params.stop_residual,
+                    seed=params.seed if params.sample_seed is None else params.sample_seed)
+    name = algorithm
+    params.flipping = name.endswith("-w-flipping")
+    if (params.flipping):
+        name = name[:-len("-w-flipping")]
+    return sweep.ALGORITHMS[name](params, problem=problem)
+
+def get_peak_rss():
+    """
+    The peak resident memory of this process, in bytes
+    """
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if (sys.platform == "darwin"):
+        return peak
+    return 1024 * peak
+
+def run_case(case):
+    """
+    Benchmarks one algorithm on one problem, in a fresh process so its peak RSS is its own
+    """
+    algorithm, point, iters, repeat = case
+    params = set_params.Params()
+    for name, value in point.items():
+        setattr(params, name, value)
+    params.max_iter = iters
+    params.seed = 0
+    problem = solver.get_problem(params)
+
+    # the best time of repeat runs
+    seconds = float("inf")
+    for k in range(repeat):
+        start = time.perf_counter()
+        results = run_algorithm(algorithm, params, problem)
+        seconds = min(seconds, time.perf_counter() - start)
+    peak_rss = get_peak_rss()
+
+    # allocations, in a separate run since tracemalloc slows it down
+    profile = AllocationProfiler()
+    tracemalloc.start()
+    try:
+        run_algorithm(algorithm, params, problem, profile)
+    finally:
+        tracemalloc.stop()
+
+    # the sampled rows, plus the rows read by the snapshots of SVRG
+    passes = (iters * params.num_samp + getattr(results, "snapshot_rows", 0)) / params.m
+    result = dict(point)
+    result.update({
+        "algorithm": algorithm,
+        "iterations": iters,
+        "seconds": seconds,
+        "iterations_per_second": iters / seconds,
+        "seconds_per_pass": seconds / passes,
+        "peak_rss_bytes": peak_rss,
+        "bytes_allocated_per_iteration": float(np.mean(profile.peaks)),
+    })
+    return result
+
+def get_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark(grid=GRID, algorithms=BENCHMARKS, iters=100, repeat=3):
+    """
+    Runs every algorithm on every point of the grid, each in its own process
+    params:
+        grid (dict): parameter name -> list of values (see sweep.expand)
+        algorithms (list): names of algorithms in BENCHMARKS to run
+        iters (int): iterations per run
+        repeat (int): runs per case, the fastest one is kept
+    returns:
+        a dict with the machine, the commit and a list of results per case
+    """
+    cases = [(algorithm, point, iters, repeat)
+             for point in sweep.expand(grid) for algorithm in algorithms]
+    results = []
+    with mp.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for result in pool.imap(run_case, cases):
+            print("%-32s m=%-7d n=%-6d num_samp=%-5d sparse=%-5s %10.1f it/s" % (
+                result["algorithm"], result["m"], result["n"], result["num_samp"],
+                result["sparse"], result["iterations_per_second"]))
+            results.append(result)
+    return {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "results": results,
+    }
+
+def get_key(result):
+    return (result["algorithm"],) + tuple(result[name] for name in sorted(GRID))
+
+def compare(old, new):
+    """
+    Prints the results of two benchmark files side by side
+    (the ratios are new / old, so a speedup is a ratio of iterations per second above 1)
+    """
+    old_results = {get_key(result): result for result in old["results"]}
+    print("old: " + str(old.get("commit")) + "  new: " + str(new.get("commit")))
+    print("%-60s %10s %10s %7s %10s %10s" % ("case", "old it/s", "new it/s", "ratio",
+                                             "rss ratio", "alloc ratio"))
+    for result in new["results"]:
+        key = get_key(result)
+        if (key not in old_results):
+            continue
+        before = old_results[key]
+        print("%-60s %10.1f %10.1f %7.2f %10.2f %10.2f" % (
+            " ".join(str(value) for value in key),
+            before["iterations_per_second"], result["iterations_per_second"],
+            result["iterations_per_second"] / before["iterations_per_second"],
+            result["peak_rss_bytes"] / before["peak_rss_bytes"],
+            result["bytes_allocated_per_iteration"] / max(before["bytes_allocated_per_iteration"], 1)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks every solver over a grid of problem sizes")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "compare"])
+    parser.add_argument("files", nargs="*", help="the two result files to compare")
+    parser.add_argument("--iters", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="benchmark.json")
+    args = parser.parse_args()
+
+    if (args.command == "compare"):
+        if (len(args.files) != 2):
+            parser.error("compare needs two result files")
+        with open(args.files[0]) as f:
+            old = json.load(f)
+        with open(args.files[1]) as f:
+            new = json.load(f)
+        compare(old, new)
+        return
+
+    results = benchmark(iters=args.iters, repeat=args.repeat)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print("saved " + args.out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Checkpoints of the state of a run, to resume it after it stops or to warm start a new run
+@authors: Jimmy Singh and Janice Lee
+@date: July 24th, 2019
+"""
+import io
+import os
+import pickle
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import shrinkage
+
+# file in the checkpoint directory naming the last complete checkpoint
+LATEST = "LATEST"
+# arrays within the pickled state at least this large are saved as .npy files
+MMAP_BYTES = 2**16
+
+def get_state(obj, prefix=""):
+    """
+    The arrays named by obj.state (the state of a step rule), including those of the
+    rule it wraps (obj.base), as a dict of prefixed names -> arrays
+    """
+    arrays = {prefix + name: getattr(obj, name) for name in obj.state}
+    if (hasattr(obj, "base")):
+        arrays.update(get_state(obj.base, prefix + "base."))
+    return arrays
+
+def set_state(obj, arrays, prefix=""):
+    """
+    Copies the arrays saved by get_state() back into obj (whose arrays are allocated)
+    """
+    restore(get_state(obj, prefix), arrays)
+
+def restore(targets, arrays):
+    """
+    Copies the saved arrays into the arrays of targets (a dict of names -> arrays)
+    """
+    for name, array in targets.items():
+        if (arrays[name].shape != array.shape):
+            raise ValueError("the checkpoint does not match the run: " + name + " has shape "
+                             + str(arrays[name].shape) + " instead of " + str(array.shape))
+        np.copyto(array, arrays[name])
+
+class StatePickler(pickle.Pickler):
+    """
+    Pickles the state of a run, handing its large arrays (such as the history in the
+    results or the indices of a sampler) to stage(name, array) instead, which copies
+    them to .npy files; the pickle refers to them by name
+    """
+    def __init__(self, file, stage):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.stage = stage
+        # id -> (name, array) of the arrays staged so far (keeping the arrays alive
+        # so that their ids are not reused)
+        self.staged = {}
+
+    def persistent_id(self, obj):
+        if (not isinstance(obj, np.ndarray) or obj.nbytes < MMAP_BYTES or obj.dtype.hasobject):
+            return None
+        if (id(obj) not in self.staged):
+            name = "pickled." + str(len(self.staged))
+            self.stage(name, obj)
+            self.staged[id(obj)] = (name, obj)
+        return self.staged[id(obj)][0]
+
+class StateUnpickler(pickle.Unpickler):
+    """
+    Loads a state pickled by a StatePickler, reading its large arrays from directory
+    """
+    def __init__(self, file, directory):
+        super().__init__(file)
+        self.directory = directory
+        self.loaded = {}
+
+    def persistent_load(self, name):
+        if (name not in self.loaded):
+            self.loaded[name] = np.load(os.path.join(self.directory, name + ".npy"))
+        return self.loaded[name]
+
+class Checkpointer:
+    """
+    Saves checkpoints into a directory, each one as a subdirectory with an .npy file
+    per array and the rest of the state pickled. A checkpoint is written to a
+    temporary directory and renamed, then LATEST is replaced to point at it, so a run
+    that dies while saving leaves the previous checkpoint intact.
+    The loop thread only copies the arrays, and the large arrays within the rest of
+    the state, into memory mapped .npy files that a worker thread preallocates in
+    the directory of the next checkpoint, and pickles what is left (which is small).
+    The worker flushes the files, writes the pickle and renames the directory, so the
+    loop waits for little more than the copies (or for the previous checkpoint if it
+    is still being written).
+    params:
+        checkpoint_dir (str): the directory to save checkpoints in
+    """
+    def __init__(self, checkpoint_dir):
+        self.checkpoint_dir = checkpoint_dir
+        if (not os.path.exists(checkpoint_dir)):
+            os.makedirs(checkpoint_dir)
+        # the directories of next checkpoints left by runs that died
+        for other in os.listdir(checkpoint_dir):
+            if (other.startswith(".next-")):
+                shutil.rmtree(os.path.join(checkpoint_dir, other), ignore_errors=True)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+        # the directory of the next checkpoint and its memory maps (name -> array)
+        self.staging = None
+        self.maps = {}
+
+    def prepare(self, layout):
+        """
+        Creates the directory of the next checkpoint, with memory maps of the given
+        layout (name -> (shape, dtype), that of the last checkpoint)
+        """
+        self.staging = tempfile.mkdtemp(prefix=".next-", dir=self.checkpoint_dir)
+        self.maps = {}
+        for name, (shape, dtype) in layout.items():
+            array = np.lib.format.open_memmap(os.path.join(self.staging, name + ".npy"), mode="w+",
+                                              dtype=dtype, shape=shape)
+            # touches every page, so the copies of the loop thread do not fault them in
+            array[...] = 0
+            self.maps[name] = array
+
+    def stage(self, name, array):
+        """
+        Copies array into its memory map in the next checkpoint (created if there is
+        none of the same shape and type)
+        """
+        target = self.maps.get(name)
+        if (target is None or target.shape != array.shape or target.dtype != array.dtype):
+            target = np.lib.format.open_memmap(os.path.join(self.staging, name + ".npy"), mode="w+",
+                                               dtype=array.dtype, shape=array.shape)
+            self.maps[name] = target
+        np.copyto(target, array)
+        self.used.add(name)
+
+    def save(self, i, arrays, state):
+        """
+        Saves the checkpoint of iteration i
+        params:
+            i (int): the iteration
+            arrays (dict): name -> array, saved as .npy files
+            state (dict): the rest of the state, pickled
+        returns: none
+        """
+        self.wait()
+        if (self.staging is None):
+            self.prepare({})
+        self.used = set()
+        for name, array in arrays.items():
+            self.stage(name, array)
+        data = io.BytesIO()
+        StatePickler(data, self.stage).dump(state)
+        maps = {name: self.maps[name] for name in self.used}
+        unused = [name for name in self.maps if name not in self.used]
+        staging = self.staging
+        self.staging = None
+        self.maps = {}
+        self.pending = self.executor.submit(self.write, i, staging, maps, unused, data.getvalue())
+
+    def write(self, i, staging, maps, unused, data):
+        for array in maps.values():
+            array.flush()
+        for name in unused:
+            os.remove(os.path.join(staging, name + ".npy"))
+        with open(os.path.join(staging, "state.pkl"), "wb") as f:
+            f.write(data)
+        name = "iter-%09d" % i
+        path = os.path.join(self.checkpoint_dir, name)
+        # a checkpoint of the same iteration left by an earlier run
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(staging, path)
+        latest = os.path.join(self.checkpoint_dir, LATEST)
+        with open(latest + ".tmp", "w") as f:
+            f.write(name)
+        os.replace(latest + ".tmp", latest)
+        # only the latest checkpoint is kept
+        for other in os.listdir(self.checkpoint_dir):
+            if (other.startswith("iter-") and other != name):
+                shutil.rmtree(os.path.join(self.checkpoint_dir, other), ignore_errors=True)
+        # preallocates the files of the next checkpoint, off the loop thread
+        self.prepare({key: (array.shape, array.dtype) for key, array in maps.items()})
+
+    def wait(self):
+        """
+        Waits for the checkpoint being written, raising any error it hit
+        """
+        if (self.pending is not None):
+            self.pending.result()
+            self.pending = None
+
+    def close(self):
+        self.wait()
+        self.executor.shutdown(wait=True)
+        if (self.staging is not None):
+            shutil.rmtree(self.staging, ignore_errors=True)
+            self.staging = None
+
+def load(path):
+    """
+    Loads a checkpoint saved by a Checkpointer
+    params:
+        path (str): the checkpoint directory, or the directory of checkpoints to load the
+                latest one of
+    returns:
+        arrays (dict): name -> read-only memory map of the saved array
+        state (dict): the rest of the state (with its large arrays read into memory)
+    """
+    latest = os.path.join(path, LATEST)
+    if (os.path.exists(latest)):
+        with open(latest) as f:
+            path = os.path.join(path, f.read().strip())
+    arrays = {}
+    for f in os.listdir(path):
+        if (f.endswith(".npy") and not f.startswith("pickled.")):
+            arrays[f[:-len(".npy")]] = np.load(os.path.join(path, f), mmap_mode="r")
+    with open(os.path.join(path, "state.pkl"), "rb") as f:
+        state = StateUnpickler(f, path).load()
+    return arrays, state
+
+def load_latest(checkpoint_dir):
+    """
+    Loads the latest checkpoint in checkpoint_dir (see load()), None if there is none
+    """
+    if (not os.path.exists(os.path.join(checkpoint_dir, LATEST))):
+        return None
+    return load(checkpoint_dir)
+
+def warm_start(path, groups, x_k, z_k, support):
+    """
+    Starts a run from the x_k and z_k of a checkpoint (see load() for path). The
+    checkpoint may be of a run with other thresholding parameters or on other data,
+    as long as n is the same; it must have one column, which every column starts
+    from, or as many columns as the new run. x_k is thresholded again with the new
+    thresholding parameters. The step rules, results and iteration count start afresh.
+    params:
+        path (str): the checkpoint to start from
+        groups (list): (rule, thresholding, lmbda, cols) of each variant of the run
+        x_k, z_k (array-like): n x K arrays of the run, overwritten
+        support (array-like): n x K boolean array, true where x_k is nonzero
+    returns: none
+    """
+    arrays, state = load(path)
+    x_start = arrays["x_k"]
+    z_start = arrays["z_k"]
+    if (z_start.shape[0] != z_k.shape[0] or z_start.shape[1] not in (1, z_k.shape[1])):
+        raise ValueError("cannot warm start " + str(z_k.shape) + " arrays from a checkpoint of shape "
+                         + str(z_start.shape))
+    z_k[...] = z_start
+    x_k[...] = x_start
+    for rule, thresholding, lmbda, cols in groups:
+        if (thresholding):
+            shrinkage.soft_threshold(z_k[:, cols], lmbda, out=x_k[:, cols], support=support[:, cols])
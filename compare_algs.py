@@ -9,6 +9,7 @@ from adagrad_lb_classic import *
 from adagrad_lb_modified import *
 from plot import *
 import matplotlib.pyplot as plt
+import numpy as np
 
 def main(): 
     # ------ CONFIGURE PARAMETERS ------
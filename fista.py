@@ -0,0 +1,36 @@
+"""
+Executes FISTA (Fast Iterative Shrinkage Thresholding Algorithm)
+@authors: Jimmy Singh and Janice Lee
+@date: July 25th, 2019
+"""
+import set_params
+import solver
+import plot
+
+def fista(params, problem=None):
+    """
+    Executes FISTA: the thresholding step of ISTA (see ista.py) taken from a point
+    extrapolated with Nesterov momentum
+    params:
+        params (Params object): contains parameters for optimization
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem
+    returns:
+        results (Results object): contains the arrays
+                with the results of the optimization
+    """
+    rule = solver.AcceleratedStep(params, solver.ClassicStep(params), proximal=True)
+    return solver.solve(params, rule, thresholding=True, problem=problem)
+
+def main():
+    # ------ CONFIGURE PARAMETERS ------
+    params = set_params.Params()
+    # ------ EXECUTE ------
+    results = fista(params)
+    # ------ PLOT ------
+    algorithm = "fista"
+    plt = plot.Plot(params)
+    plt.update_algorithm(algorithm, results, thresholding=True)
+    plt.plot_all()
+
+if __name__ == "__main__":
+    main()
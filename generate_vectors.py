@@ -5,41 +5,41 @@ Generates vectors/arrays to use in optimization algorithms
 """
 import numpy as np
 import numpy.random as random
-np.random.seed(0)
 
-def rand_exp_decay(n, a, b):
+def rand_exp_decay(n, a, b, rng=random):
     """
     Creates a random semi-sparse array with exponentially decreasing elements
     params:
         n (int): desired number of elements in the array
         a (float): ???
         b (float): ???
+        rng (RandomState): the random number generator to draw from (defaults to np.random)
     returns:
         R (numpy array): array with exponentially decreasing elements
     """
     A = np.log(a)
     B = np.log(b)
-    R1 = A + (B-A) * random.rand(n)
+    R1 = A + (B-A) * rng.rand(n)
     R = np.exp(R1*2)
-    idx = random.permutation(n)
-    for i in idx[0:int(np.floor(n/2))]:
-        R[i] = -R[i]
+    idx = rng.permutation(n)
+    R[idx[0:int(np.floor(n/2))]] *= -1
     return R.reshape(n, 1)
     
-def rand_sparse(n, num_sparse):
+def rand_sparse(n, num_sparse, rng=random):
     """
     Creates a random sparse array
     params:
         n (int): desired number of elements in the array
         num_sparse (int): desired number of non-zero elements in the array
+        rng (RandomState): the random number generator to draw from (defaults to np.random)
     returns:
         R (numpy array): sparse array
     """
     R = np.zeros((n,1), dtype=float)
     # R = np.zeros(n, dtype=float)
-    idx = random.permutation(n)
-    for i in idx[0:num_sparse]:
-        R[i] = random.rand(1)
+    idx = rng.permutation(n)
+    # the same numbers as drawing one at a time
+    R[idx[0:num_sparse], 0] = rng.rand(len(idx[0:num_sparse]))
     return R
     
 def add_awgn_noise(x, snr_dB):
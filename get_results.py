@@ -4,59 +4,163 @@ Class to store and update the results of optimization algorithms
 @date: June 24th, 2019
 """
 import numpy as np
-import numpy.linalg as la
+
+import history as hist
+from metrics import METRICS
+
+# the metrics computed by default, and how often (every iteration)
+DEFAULT_METRICS = {"residual": 1, "onenorm": 1, "moder": 1}
+
+def get_plotted_coords(x_true):
+    """
+    The coordinates of x whose history is plotted (the first 25 nonzeros of x_true)
+    """
+    if (x_true is None):
+        return np.zeros(0, dtype=int)
+    return np.argwhere(x_true!=0)[:25, 0]
 
 class Results: 
-    def __init__(self, max_iter, n, x_true):
-        self.residuals = np.zeros((max_iter))
-        self.onenorm = np.zeros((max_iter))
-        self.moder = np.zeros((max_iter))
-        self.x_history = np.zeros((max_iter, n))
-        self.z_history = np.zeros((max_iter, n))
-        self.t_history = np.zeros((max_iter, n))
+    def __init__(self, max_iter, n, x_true, history=None, recent=None, metrics=None):
+        """
+        params:
+            max_iter (int): most iterations that will be recorded
+            n (int): length of x_k
+            x_true (array-like): the true solution, None if it is not known
+            history (history object): records x_k, z_k and t_k (see history.py),
+                    every coordinate at every iteration if None
+            recent (history.RingBuffer): also holds the last states, None to disable
+            metrics (dict): metric name (see metrics.py) -> how often it is computed:
+                    every k iterations (an int k) or "final" for only the last iteration.
+                    Other metrics can still be computed from the last state with evaluate().
+                    The residual, one norm and model error at every iteration if None.
+        """
+        if (metrics is None):
+            metrics = DEFAULT_METRICS
+        for name in metrics:
+            if (name not in METRICS):
+                raise ValueError("unknown metric: " + str(name))
+        self.metrics = dict(metrics)
+        # the values of the metrics computed every k iterations, and how many there are
+        self.values = {}
+        self.counts = {}
+        for name, every in self.metrics.items():
+            if (every != "final"):
+                self.values[name] = np.zeros((max_iter // every))
+                self.counts[name] = 0
+        # the values of the metrics at the last iteration (see finish())
+        self.final = {}
+        if (history is None):
+            history = hist.FullHistory(max_iter, n)
+        self.history = history
+        self.recent = recent
+        # the last value of x_k, and of the residual and b_sub
+        self.x_final = np.zeros((n, 1))
+        self.residual_final = None
+        self.b_sub_final = None
+        # x_true is None when the true solution is not known
         self.x_true = x_true
-        self.idx_nonzeros = np.argwhere(x_true!=0)[:, 0]
+        if (x_true is None):
+            self.idx_nonzeros = np.zeros(0, dtype=int)
+        else:
+            self.idx_nonzeros = np.argwhere(x_true!=0)[:, 0]
         self.i = 0
+        # why the algorithm stopped (see stopping.py)
+        self.stop_reason = "max-iter"
+        # full gradient snapshots taken by the run (SVRG) and the rows of A they read, on
+        # top of the sampled rows
+        self.snapshots = 0
+        self.snapshot_rows = 0
+        # the time spent in each phase of the run (see profiler.py), None unless profiled
+        self.profile = None
     
     def update(self, residual, b_sub, n, x_k, z_k, t_k, adaptive):
         self.update_iteration()
-        self.update_residuals(residual, b_sub)
-        self.update_onenorm(x_k)
-        self.update_moder(x_k)
-        self.update_x_history(x_k, n)
-        self.update_z_history(z_k, n)
-        self.update_t_history(t_k, n, adaptive)
+        self.update_metrics(residual, b_sub, x_k)
+        self.update_history(x_k, z_k, t_k, n, adaptive)
+        self.update_final(residual, b_sub, x_k)
         
+    def truncate(self):
+        # drops the rows of the iterations that were not run
+        for name in self.values:
+            self.values[name] = self.values[name][:self.counts[name]]
+        self.history.truncate()
+        
+    def finish(self):
+        # computes the metrics that are only wanted at the last iteration
+        for name, every in self.metrics.items():
+            if (every == "final"):
+                self.final[name] = self.evaluate(name)
         
     def update_iteration(self):
         self.i += 1
         
-    def update_residuals(self, residual, b_sub):
-        self.residuals[self.i-1] = la.norm(residual, 2) / la.norm(b_sub, 2)
-        
-    def update_onenorm(self, x_k):
-        self.onenorm[self.i-1] = la.norm(x_k, 1)
+    def update_metrics(self, residual, b_sub, x_k):
+        for name, values in self.values.items():
+            if (self.i % self.metrics[name] == 0):
+                if (self.counts[name] < len(values)):
+                    values[self.counts[name]] = METRICS[name](self, x_k, residual, b_sub)
+                self.counts[name] += 1
     
-    def update_moder(self, x_k):
-        self.moder[self.i-1] = la.norm(self.x_true - x_k, 2) / la.norm(self.x_true, 2)
+    def update_final(self, residual, b_sub, x_k):
+        if (self.residual_final is None):
+            self.residual_final = np.zeros(residual.shape)
+            self.b_sub_final = np.zeros(b_sub.shape)
+        self.x_final[...] = x_k
+        self.residual_final[...] = residual
+        self.b_sub_final[...] = b_sub
 
-    def update_x_history(self, x_k, n):
-        self.x_history[self.i-1, :] = x_k.reshape(n,)
+    def update_history(self, x_k, z_k, t_k, n, adaptive):
+        x_k = x_k.reshape(n,)
+        z_k = z_k.reshape(n,)
+        if adaptive:
+            t_k = t_k.reshape(n,)
+        self.history.record(x_k, z_k, t_k)
+        if (self.recent is not None):
+            self.recent.record(x_k, z_k, t_k)
+            
+    def evaluate(self, name):
+        """
+        Computes a metric (see metrics.py) from the last recorded iteration
+        """
+        return METRICS[name](self, self.x_final, self.residual_final, self.b_sub_final)
+        
+    def get_metric(self, name):
+        """
+        The values of a metric computed every k iterations (see get_metric_iterations)
+        """
+        if (name not in self.values):
+            raise ValueError(str(name) + " is not computed every k iterations (see params.metrics)")
+        return self.values[name][:self.counts[name]]
+        
+    def get_metric_iterations(self, name):
+        # the iterations (starting at 1) the values of a metric were computed at
+        return self.metrics[name] * np.arange(1, len(self.get_metric(name)) + 1)
+        
+    def get_final(self, name):
+        """
+        The value of a metric at the last iteration
+        """
+        if (name not in self.final):
+            self.final[name] = self.evaluate(name)
+        return self.final[name]
     
-    def update_z_history(self, z_k, n):
-        self.z_history[self.i-1, :] = z_k.reshape(n,)
+    @property
+    def residuals(self):
+        return self.get_metric("residual")
     
-    def update_t_history(self, t_k, n, adaptive):
-        if adaptive:
-            self.t_history[self.i-1, :] = t_k.reshape(n,)
-        else:
-            self.t_history[self.i-1, :] = t_k
+    @property
+    def onenorm(self):
+        return self.get_metric("onenorm")
+    
+    @property
+    def moder(self):
+        return self.get_metric("moder")
             
     def get_t_history_small(self):
-        return self.t_history[:,self.idx_nonzeros][:,14]
+        return self.history.get("t", self.idx_nonzeros[[14]])[:, 0]
     
     def get_t_history_large(self):
-        return self.t_history[:,self.idx_nonzeros][:,8]
+        return self.history.get("t", self.idx_nonzeros[[8]])[:, 0]
         
     def get_residuals(self):
         return self.residuals 
@@ -68,19 +172,23 @@ class Results:
         return self.moder  
         
     def get_x_history(self):
-        return self.x_history 
+        return self.history.get("x")
         
     def get_z_history(self):
-        return self.z_history
+        return self.history.get("z")
         
     def get_t_history(self):
-        return self.t_history
+        return self.history.get("t")
+    
+    def get_history_iterations(self):
+        # the iterations (starting at 1) of the rows of the histories
+        return self.history.get_iterations()
     
     def get_x_history_nonzeros(self):
-        return self.x_history[:, self.idx_nonzeros[:25]]
+        return self.history.get("x", self.idx_nonzeros[:25])
         
     def get_z_history_nonzeros(self):
-        return self.z_history[:, self.idx_nonzeros[:25]]
+        return self.history.get("z", self.idx_nonzeros[:25])
         
     def get_percent_nonzeros_recovered(self):
-        return float(len(np.argwhere(self.x_history[-1, self.idx_nonzeros]!=0)[:,0])) / len(self.idx_nonzeros)
+        return self.get_final("percent-nonzeros-recovered")
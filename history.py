@@ -0,0 +1,208 @@
+"""
+Policies for recording the history of x_k, z_k and t_k in the results
+@authors: Jimmy Singh and Janice Lee
+@date: July 18th, 2019
+"""
+import numpy as np
+
+def get_entries(t_k, idx):
+    """
+    The entries idx of t_k, which is a scalar when the step size is not component-wise
+    """
+    if (np.ndim(t_k) == 0):
+        return t_k
+    return t_k[idx]
+
+class FullHistory:
+    """
+    Records every coordinate at every iteration (max_iter x n per array)
+    Histories record x_k, z_k and t_k (as n vectors, t_k may be a scalar) with record()
+    and return them with get(), as an array with a row per recorded iteration.
+    """
+    def __init__(self, max_iter, n):
+        self.x = np.zeros((max_iter, n))
+        self.z = np.zeros((max_iter, n))
+        self.t = np.zeros((max_iter, n))
+        self.i = 0
+
+    def record(self, x_k, z_k, t_k):
+        self.x[self.i] = x_k
+        self.z[self.i] = z_k
+        self.t[self.i] = t_k
+        self.i += 1
+
+    def get(self, name, idx=None):
+        """
+        The history of x, z or t
+        params:
+            name (str): "x", "z" or "t"
+            idx (array-like): the coordinates to return, None for all of them
+        returns:
+            array with a row per recorded iteration and a column per coordinate
+        """
+        history = getattr(self, name)[:self.i]
+        if (idx is None):
+            return history
+        return history[:, idx]
+
+    def get_iterations(self):
+        """
+        The iterations (starting at 1) of the rows returned by get()
+        """
+        return np.arange(1, self.i + 1)
+
+    def truncate(self):
+        self.x = self.x[:self.i]
+        self.z = self.z[:self.i]
+        self.t = self.t[:self.i]
+
+class EveryHistory(FullHistory):
+    """
+    Records every coordinate every k-th iteration (max_iter/k x n per array)
+    """
+    def __init__(self, max_iter, n, k):
+        FullHistory.__init__(self, max_iter // k, n)
+        self.k = k
+        self.count = 0
+
+    def record(self, x_k, z_k, t_k):
+        self.count += 1
+        if (self.count % self.k == 0):
+            FullHistory.record(self, x_k, z_k, t_k)
+
+    def get_iterations(self):
+        return self.k * np.arange(1, self.i + 1)
+
+class CoordHistory(FullHistory):
+    """
+    Records only the chosen coordinates at every iteration (max_iter x len(coords) per array)
+    """
+    def __init__(self, max_iter, coords):
+        FullHistory.__init__(self, max_iter, len(coords))
+        self.coords = np.asarray(coords, dtype=int)
+
+    def record(self, x_k, z_k, t_k):
+        FullHistory.record(self, x_k[self.coords], z_k[self.coords], get_entries(t_k, self.coords))
+
+    def get(self, name, idx=None):
+        """
+        The history of x, z or t at idx (all the recorded coordinates if None),
+        which must be among the recorded coordinates
+        """
+        if (idx is None):
+            return FullHistory.get(self, name)
+        return FullHistory.get(self, name, self.positions(idx))
+
+    def positions(self, idx):
+        idx = np.asarray(idx, dtype=int)
+        positions = np.searchsorted(self.coords, idx)
+        positions = np.minimum(positions, len(self.coords) - 1)
+        if (len(self.coords) == 0 or np.any(self.coords[positions] != idx)):
+            raise ValueError("the history of these coordinates was not recorded")
+        return positions
+
+class SparseHistory(CoordHistory):
+    """
+    Records x_k as sparse (iteration, index, value) deltas: only the entries that
+    changed since the previous iteration are stored, which is cheap while x_k is
+    sparse (as with thresholding). z_k and t_k change everywhere, so they are only
+    recorded at the chosen coordinates.
+    """
+    def __init__(self, max_iter, n, coords):
+        CoordHistory.__init__(self, max_iter, coords)
+        self.n = n
+        self.previous = np.zeros(n)
+        self.indices = []
+        self.values = []
+
+    def record(self, x_k, z_k, t_k):
+        CoordHistory.record(self, x_k, z_k, t_k)
+        changed = np.flatnonzero(x_k != self.previous)
+        self.indices.append(changed)
+        self.values.append(x_k[changed])
+        self.previous[changed] = x_k[changed]
+
+    def get(self, name, idx=None):
+        if (name != "x"):
+            return CoordHistory.get(self, name, idx)
+        # replays the deltas
+        x = np.zeros(self.n)
+        history = np.zeros((self.i, self.n if idx is None else len(idx)))
+        for k in range(self.i):
+            x[self.indices[k]] = self.values[k]
+            history[k] = x if idx is None else x[idx]
+        return history
+
+class NoHistory:
+    """
+    Records nothing
+    """
+    def __init__(self):
+        self.i = 0
+
+    def record(self, x_k, z_k, t_k):
+        self.i += 1
+
+    def get(self, name, idx=None):
+        raise ValueError("no history was recorded (see params.history)")
+
+    def get_iterations(self):
+        return np.zeros(0, dtype=int)
+
+    def truncate(self):
+        pass
+
+class RingBuffer:
+    """
+    Holds x_k, z_k and t_k from the last size iterations (size x n per array),
+    overwriting the oldest ones
+    """
+    def __init__(self, size, n):
+        self.x = np.zeros((size, n))
+        self.z = np.zeros((size, n))
+        self.t = np.zeros((size, n))
+        self.size = size
+        self.i = 0
+
+    def record(self, x_k, z_k, t_k):
+        k = self.i % self.size
+        self.x[k] = x_k
+        self.z[k] = z_k
+        self.t[k] = t_k
+        self.i += 1
+
+    def get(self, name):
+        """
+        The last (up to size) values of x, z or t, from oldest to newest
+        """
+        order = np.arange(max(self.i - self.size, 0), self.i) % self.size
+        return getattr(self, name)[order]
+
+    def get_iterations(self):
+        return np.arange(max(self.i - self.size, 0), self.i) + 1
+
+def make_history(params, max_iter, n, coords):
+    """
+    Creates the history chosen by params.history
+    params:
+        params (Params object): contains the history parameters
+        max_iter (int): most iterations that will be recorded
+        n (int): length of x_k
+        coords (array-like): coordinates to record when params.history_coords is None
+    returns:
+        the history object
+    """
+    if (params.history_coords is not None):
+        coords = params.history_coords
+    coords = np.unique(np.asarray(coords, dtype=int))
+    if (params.history == "full"):
+        return FullHistory(max_iter, n)
+    if (params.history == "every"):
+        return EveryHistory(max_iter, n, params.history_every)
+    if (params.history == "coords"):
+        return CoordHistory(max_iter, coords)
+    if (params.history == "sparse"):
+        return SparseHistory(max_iter, n, coords)
+    if (params.history == "none"):
+        return NoHistory()
+    raise ValueError("unknown history policy: " + str(params.history))
@@ -3,31 +3,137 @@ Initializes the Ax = b minimization problem
 @authors: Jimmy Singh and Janice Lee
 @date: June 21st, 2019 
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-np.random.seed(0)
+
 import generate_vectors as gen
+import operators
+
+try:
+    import scipy.sparse as sps
+except ImportError:
+    sps = None
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
 
-def init_l1(m, n, num_samp, max_iter, sparse=True, noise=False):
+# rows of A drawn at a time (each block of a seeded problem has its own stream)
+BLOCK_ROWS = 1000
+
+def init_l1(m, n, num_samp, max_iter, sparse=True, noise=False, seed=None, dtype=np.float64, threads=None):
     """
     Initializes Ax = b for an l1-norm minimization/basis pursuit problem
+    The problem is drawn from its own random number generators, so the same seed
+    always gives the same problem (a seed of None draws from fresh entropy)
+    A is drawn in parallel blocks of BLOCK_ROWS rows, each from its own stream
+    spawned from the seed (see draw_A), so A does not depend on the number of
+    threads. A and b are stored in dtype; in float32, A holds the same numbers as in
+    float64, rounded, and b is computed in float64 from the rounded A
+    params:
+        threads (int): threads to draw A with, None for one per core
     """
+    rng = np.random.RandomState(seed)
+    
     # initializes the true value of x (x*)
-    if (sparse):
-        x_true = gen.rand_sparse(n, 400)
-    else:
-        x_true = gen.rand_exp_decay(n, 0.0001, np.sqrt(5))
+    x_true = init_x_true(n, sparse, rng)
         
     # initializes the true values of A and b
     # true values of A and y
-    A = np.random.randn(m, n)
-    b_true = np.dot(A, x_true)
+    A, b_true = draw_A(m, n, x_true, seed, dtype, threads)
     
     # adds noise if needed 
+    b = add_noise(b_true, noise, rng)
+    
+    return A, x_true, b.astype(dtype, copy=False)
+
+def draw_A(m, n, x_true, seed, dtype=np.float64, threads=None):
+    """
+    Draws a Gaussian m x n A and b_true = A * x_true a block of BLOCK_ROWS rows at a
+    time on a pool of threads. Block k is drawn from the k-th stream spawned from
+    np.random.SeedSequence(seed), so A only depends on the seed (and m, n).
+    NumPy releases the GIL while it draws and multiplies, so the blocks are drawn
+    in parallel; BLAS is limited to one thread meanwhile (with threadpoolctl, as in
+    sweep.py), so the products of the blocks do not oversubscribe the cores.
+    returns:
+        A (array-like): m x n array of type dtype
+        b_true (array-like): m x 1 float64 array
+    """
+    A = np.zeros((m, n), dtype=dtype)
+    b_true = np.zeros((m, 1))
+    starts = range(0, m, BLOCK_ROWS)
+    streams = np.random.SeedSequence(seed).spawn(len(starts))
+
+    def draw_block(start, stream):
+        end = min(start + BLOCK_ROWS, m)
+        rng = np.random.Generator(np.random.PCG64(stream))
+        if (np.dtype(dtype) == np.float64):
+            rng.standard_normal(out=A[start:end])
+            np.dot(A[start:end], x_true, out=b_true[start:end])
+        else:
+            A[start:end] = rng.standard_normal((end - start, n))
+            np.dot(A[start:end].astype(np.float64), x_true, out=b_true[start:end])
+
+    if (threads is None):
+        threads = os.cpu_count() or 1
+    limits = None
+    if (threads > 1 and threadpoolctl is not None):
+        limits = threadpoolctl.threadpool_limits(1)
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # list() raises the errors of the blocks
+            list(executor.map(draw_block, starts, streams))
+    finally:
+        if (limits is not None):
+            limits.restore_original_limits()
+    return A, b_true
+
+def init_l1_operator(m, n, kind, sparse=True, noise=False, seed=0, nonzeros=8, dtype=np.float64):
+    """
+    Initializes Ax = b with a matrix-free A (see operators.make_operator), so only
+    x_true and b are stored
+    """
+    rng = np.random.RandomState(seed)
+    x_true = init_x_true(n, sparse, rng)
+    A = operators.make_operator(kind, m, n, seed, nonzeros, dtype)
+    b = add_noise(A.matvec(x_true), noise, rng)
+    return A, x_true, b.astype(dtype, copy=False)
+
+def init_l1_sparse(m, n, density, sparse=True, noise=False, seed=None, dtype=np.float64):
+    """
+    Initializes Ax = b with a sparse A, stored as a scipy.sparse CSR matrix with a
+    fraction density of nonzeros. The nonzeros are normal with variance 1/density,
+    so the rows of A have the same expected norm as a Gaussian A.
+    """
+    if (sps is None):
+        raise ImportError("a sparse A needs scipy")
+    rng = np.random.RandomState(seed)
+    x_true = init_x_true(n, sparse, rng)
+    A = sps.random(m, n, density=density, format="csr", dtype=dtype,
+                   random_state=rng, data_rvs=rng.standard_normal)
+    A.data *= 1 / np.sqrt(density)
+    b = add_noise(A @ x_true, noise, rng)
+    return A, x_true, b.astype(dtype, copy=False)
+
+def init_x_true(n, sparse, rng):
+    """
+    Initializes the true value of x (x*)
+    """
+    if (sparse):
+        return gen.rand_sparse(n, 400, rng)
+    else:
+        return gen.rand_exp_decay(n, 0.0001, np.sqrt(5), rng)
+
+def add_noise(b_true, noise, rng):
+    """
+    Adds noise to b if needed 
+    """
     if (noise):
-        b = b_true + np.random.normal(0, 1, b_true.shape)
+        return b_true + rng.normal(0, 1, b_true.shape)
         #TODO: FIX THIS LOL 
         # y = gen.add_awgn_noise(y_true, -20)
     else:
-        b = b_true
-    
-    return A, x_true, b
+        return b_true
@@ -4,25 +4,16 @@ Executes ISTA (Iterative Shrinkage Thresholding Algorithm)
 @date: June 11th, 2019
 """
 import numpy as np
-import numpy.random as random
 import numpy.linalg as la
-np.random.seed(0)
 
 import init_problem as init
 import plot
-    
-def threshold(x, lmbda): 
-    """
-    Replaces values in x that are less than lambda with 0
-    params: 
-        x (array-like): the array to threshold
-        lmbda (float): the value to threshold by 
-    returns: 
-        a thresholded array 
-    """
-    return np.multiply(np.maximum(np.absolute(x) - lmbda, 0), np.sign(x))
+import profiler
+import sampling
+import shrinkage
 
-def ista(m, n, num_samp, max_iter, lmbda, sparse=True, noise=False):
+def ista(m, n, num_samp, max_iter, lmbda, sparse=True, noise=False, problem=None, verbose=True, profile=None,
+         stop_moder=None, stop_residual=None, seed=None):
     """
     Executes ISTA 
     params:
@@ -33,20 +24,35 @@ def ista(m, n, num_samp, max_iter, lmbda, sparse=True, noise=False):
         lmbda (float): the thresholding parameter 
         sparse (bool): true if the soln is sparse 
         noise (bool): true if the data contains noise 
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem
+                (A may be a scipy.sparse CSR matrix)
+        verbose (bool): true to print each iteration
+        profile (profiler object): times the phases of each iteration (see profiler.py),
+                None to not time them
+        stop_moder (float): stop once the model error is at most this, None to disable
+        stop_residual (float): stop once the residual is at most this, None to disable
+        seed (int): seed the problem and the samples are drawn with, None for fresh entropy
     returns:
         results (array-like): a tuple containing the arrays 
                 with the results of the optimization
     """
     # ------ SETTING PARAMETERS ------
     # initializes the Ax = y problem 
-    problem = init.init_l1(m, n, num_samp, max_iter, sparse, noise)
+    if (problem is None):
+        problem = init.init_l1(m, n, num_samp, max_iter, sparse, noise, seed=seed)
+    if (profile is None):
+        profile = profiler.NullProfiler()
     A = problem[0]
     x_true = problem[1]
     b = problem[2]
+    # chooses the rows of A and b at each iteration (the start of a permutation of n)
+    sampler = sampling.PermutationSampler(A, b, num_samp, np.random.default_rng(seed))
 
     # current values of x and z
     x_k = np.zeros((n, 1))
     z_k = np.zeros((n, 1))
+    # preallocated buffer for the step ( t_k * gradient )
+    update = np.zeros((n, 1))
 
     # arrays to hold results 
     residuals = np.zeros((max_iter))
@@ -55,38 +61,50 @@ def ista(m, n, num_samp, max_iter, lmbda, sparse=True, noise=False):
 
     # ------ MAIN LOOP ------
     for i in range(1, max_iter+1):
-        print("iteration: " + str(i))
+        if (verbose):
+            print("iteration: " + str(i))
+        profile.begin(i)
         
         # ------ SAMPLING ------
-        # choosing random rows of A
-        idx = random.permutation(n)
-
-        # getting the corresponding rows of A and y
-        A_sub = A[idx[:num_samp], :]
-        b_sub = b[idx[:num_samp]]
+        # choosing random rows of A and getting the corresponding rows of A and y
+        A_sub, b_sub = sampler.sample()
         # TODO: FIX THIS LOL 
         # y_sub = y[0, idx[:num_samp]]
+        profile.mark("sampling")
 
         # ------ RESIDUAL AND GRADIENT ------
         # gets the residual ( Ax - b )
-        residual = np.dot(A_sub, x_k) - b_sub
+        residual = A_sub @ x_k - b_sub
+        profile.mark("residual")
         # gets the gradient ( A.T * residual )
-        gradient = np.dot(A_sub.T, residual)
+        gradient = A_sub.T @ residual
+        profile.mark("gradient")
 
         # ------ STEP SIZE ------
         # getting the step size
         t_k = la.norm(residual, 2)**2/la.norm(gradient, 2)**2
+        profile.mark("step")
         
         # ------ UPDATING X AND Z  ------
-        z_k = x_k - t_k * gradient
-        x_k = threshold(z_k, lmbda)
+        # z_k = x_k - t_k * gradient and x_k = S(z_k), in place
+        z_k[...] = x_k
+        np.multiply(t_k, gradient, out=update)
+        shrinkage.update_threshold(z_k, update, lmbda, out=x_k)
+        profile.mark("threshold")
         
         # ------ RESULTS ------
         residuals[i-1] = la.norm(residual, 2) / la.norm(b_sub, 2)
         onenorm[i-1] = la.norm(x_k, 1)
         moder[i-1] = la.norm(x_true - x_k, 2) / la.norm(x_true, 2)
+        profile.mark("results")
+        
+        # ------ STOPPING ------
+        if (stop_moder is not None and moder[i-1] <= stop_moder):
+            break
+        if (stop_residual is not None and residuals[i-1] <= stop_residual):
+            break
         
-    return residuals, onenorm, moder
+    return residuals[:i], onenorm[:i], moder[:i]
     
 
 def main():
@@ -98,12 +116,13 @@ def main():
     lmbda = 3.0
     sparse = True
     noise = False
+    seed = 0
     
     plot_residual = True
     plot_onenorm = True
     plot_moder = True 
     # ------ EXECUTE ------
-    results = ista(m, n, num_samp, max_iter, lmbda, sparse, noise)
+    results = ista(m, n, num_samp, max_iter, lmbda, sparse, noise, seed=seed)
     
     # print(results[0])
     # print(results[1])
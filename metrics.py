@@ -0,0 +1,46 @@
+"""
+Registry of the metrics the results can record
+@authors: Jimmy Singh and Janice Lee
+@date: July 19th, 2019
+"""
+import numpy as np
+import numpy.linalg as la
+
+# metric name -> function computing it from (results, x_k, residual, b_sub)
+METRICS = {}
+
+def register(name):
+    """
+    Decorator that adds a metric function to the registry under name
+    """
+    def add(f):
+        METRICS[name] = f
+        return f
+    return add
+
+@register("residual")
+def residual(results, x_k, residual, b_sub):
+    # relative residual of the sampled rows ( ||Ax - b|| / ||b|| )
+    return la.norm(residual, 2) / la.norm(b_sub, 2)
+
+@register("onenorm")
+def onenorm(results, x_k, residual, b_sub):
+    return la.norm(x_k, 1)
+
+@register("moder")
+def moder(results, x_k, residual, b_sub):
+    # model error ( ||x_true - x|| / ||x_true|| )
+    if (results.x_true is None):
+        return np.nan
+    return la.norm(results.x_true - x_k, 2) / la.norm(results.x_true, 2)
+
+@register("percent-nonzeros-recovered")
+def percent_nonzeros_recovered(results, x_k, residual, b_sub):
+    # fraction of the nonzeros of x_true that are nonzero in x
+    if (len(results.idx_nonzeros) == 0):
+        return np.nan
+    return float(np.count_nonzero(x_k[results.idx_nonzeros])) / len(results.idx_nonzeros)
+
+@register("support-size")
+def support_size(results, x_k, residual, b_sub):
+    return np.count_nonzero(x_k)
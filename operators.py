@@ -0,0 +1,214 @@
+"""
+Matrix-free sensing operators that produce rows of A on demand instead of storing A
+@authors: Jimmy Singh and Janice Lee
+@date: July 12th, 2019
+"""
+import numpy as np
+
+try:
+    import scipy.fft as fft
+except ImportError:
+    fft = None
+
+try:
+    import scipy.sparse as sps
+except ImportError:
+    sps = None
+
+def is_sparse(A):
+    """
+    True if A is a scipy.sparse matrix
+    """
+    return sps is not None and sps.issparse(A)
+
+def matvec(A_sub, x, out):
+    """
+    Computes A_sub * x into out, for a dense or scipy.sparse block of rows or a row
+    block of an operator
+    """
+    if (isinstance(A_sub, np.ndarray)):
+        np.dot(A_sub, x, out=out)
+    elif (is_sparse(A_sub)):
+        out[...] = A_sub @ x
+    else:
+        out[...] = A_sub.matvec(x)
+    return out
+
+def rmatvec(A_sub, r, out):
+    """
+    Computes A_sub.T * r into out, for a dense or scipy.sparse block of rows or a row
+    block of an operator
+    """
+    if (isinstance(A_sub, np.ndarray)):
+        np.dot(A_sub.T, r, out=out)
+    elif (is_sparse(A_sub)):
+        out[...] = A_sub.T @ r
+    else:
+        out[...] = A_sub.rmatvec(r)
+    return out
+
+def row_generator(seed, row):
+    """
+    Independent random number generator for one row of an operator: the same
+    (seed, row) always gives the same numbers, whichever other rows are drawn
+    """
+    return np.random.Generator(np.random.Philox(key=np.array([row, seed], dtype=np.uint64)))
+
+class LinearOperator:
+    """
+    An m x n matrix A that is never stored: rows(idx) gives the rows the solvers sample,
+    either as a dense block (written into out when it is given) or as a row block
+    object with matvec() and rmatvec()
+    """
+    def rows(self, idx, out=None):
+        raise NotImplementedError
+
+    def matvec(self, x, block_rows=1000):
+        """
+        Computes A * x, a block of rows at a time
+        params:
+            x (array-like): n x 1 vector
+            block_rows (int): rows of A to produce at a time
+        returns:
+            the m x 1 product
+        """
+        m = self.shape[0]
+        y = np.zeros((m, x.shape[1]), dtype=np.result_type(self.dtype, x.dtype))
+        for start in range(0, m, block_rows):
+            idx = np.arange(start, min(start+block_rows, m))
+            matvec(self.rows(idx), x, out=y[start:start+len(idx)])
+        return y
+
+class GaussianOperator(LinearOperator):
+    """
+    A with independent standard normal entries (like np.random.randn(m, n)), where
+    each row is regenerated from (seed, row) whenever it is sampled
+    """
+    def __init__(self, m, n, seed=0, dtype=np.float64):
+        self.shape = (m, n)
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+        self.block = np.zeros((0, n), dtype=self.dtype)
+
+    def rows(self, idx, out=None):
+        if (out is None):
+            # reuses the block of rows from the previous call when it is the same size
+            if (len(self.block) != len(idx)):
+                self.block = np.zeros((len(idx), self.shape[1]), dtype=self.dtype)
+            out = self.block
+        for j, row in enumerate(idx):
+            row_generator(self.seed, row).standard_normal(out=out[j], dtype=self.dtype)
+        return out
+
+class DCTRows:
+    """
+    Rows of a PartialDCTOperator, multiplied with FFTs
+    """
+    def __init__(self, op, idx):
+        self.op = op
+        n = op.shape[1]
+        # the sign pattern (block) and frequency of each row
+        self.blocks, inverse = np.unique(idx // n, return_inverse=True)
+        self.inverse = inverse.reshape(-1)
+        self.freqs = idx % n
+
+    def matvec(self, x):
+        op = self.op
+        y = np.zeros((len(self.freqs), x.shape[1]), dtype=np.result_type(op.dtype, x.dtype))
+        for k, block in enumerate(self.blocks):
+            rows = np.argwhere(self.inverse == k)[:, 0]
+            X = fft.dct(op.signs(block) * x, norm="ortho", axis=0)
+            y[rows] = X[self.freqs[rows]]
+        y *= op.scale
+        return y
+
+    def rmatvec(self, r):
+        op = self.op
+        n = op.shape[1]
+        g = np.zeros((n, r.shape[1]), dtype=np.result_type(op.dtype, r.dtype))
+        V = np.zeros((n, r.shape[1]), dtype=g.dtype)
+        for k, block in enumerate(self.blocks):
+            rows = np.argwhere(self.inverse == k)[:, 0]
+            V[:] = 0
+            np.add.at(V, self.freqs[rows], r[rows])
+            g += op.signs(block) * fft.idct(V, norm="ortho", axis=0)
+        g *= op.scale
+        return g
+
+class PartialDCTOperator(LinearOperator):
+    """
+    Randomized partial DCT: row r of A is row (r mod n) of the orthonormal n x n DCT
+    matrix times a random sign pattern for every block of n rows, scaled by sqrt(n)
+    so its rows have the same norm as a Gaussian A. Products with a sample of rows
+    cost O(n log n) per block of n rows they touch.
+    """
+    def __init__(self, m, n, seed=0, dtype=np.float64):
+        if (fft is None):
+            raise ImportError("PartialDCTOperator needs scipy")
+        self.shape = (m, n)
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+        self.scale = np.sqrt(n)
+
+    def signs(self, block):
+        """
+        The random sign pattern of a block of n rows, as an n x 1 vector
+        """
+        n = self.shape[1]
+        rng = row_generator(self.seed, block)
+        return (2 * rng.integers(0, 2, size=(n, 1)) - 1).astype(self.dtype)
+
+    def rows(self, idx, out=None):
+        return DCTRows(self, np.asarray(idx))
+
+class SparseRows:
+    """
+    Rows of a SparseJLOperator, stored as the columns and values of their nonzeros
+    """
+    def __init__(self, n, cols, vals):
+        self.n = n
+        self.cols = cols
+        self.vals = vals
+
+    def matvec(self, x):
+        return np.einsum("ks,ksj->kj", self.vals, x[self.cols])
+
+    def rmatvec(self, r):
+        g = np.zeros((self.n, r.shape[1]), dtype=np.result_type(self.vals.dtype, r.dtype))
+        np.add.at(g, self.cols.reshape(-1), (self.vals[:, :, None] * r[:, None, :]).reshape(-1, r.shape[1]))
+        return g
+
+class SparseJLOperator(LinearOperator):
+    """
+    Sparse Johnson-Lindenstrauss matrix: each row has s nonzeros of +-sqrt(n/s) in
+    random columns (rows have the same norm as a Gaussian A), regenerated from
+    (seed, row). Products with a sample of rows cost O(s) per row.
+    """
+    def __init__(self, m, n, s=8, seed=0, dtype=np.float64):
+        self.shape = (m, n)
+        self.s = s
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+        self.value = np.sqrt(n / s)
+
+    def rows(self, idx, out=None):
+        n = self.shape[1]
+        cols = np.zeros((len(idx), self.s), dtype=int)
+        vals = np.zeros((len(idx), self.s), dtype=self.dtype)
+        for j, row in enumerate(idx):
+            rng = row_generator(self.seed, row)
+            cols[j] = rng.choice(n, self.s, replace=False)
+            vals[j] = self.value * (2 * rng.integers(0, 2, size=self.s) - 1)
+        return SparseRows(n, cols, vals)
+
+def make_operator(kind, m, n, seed=0, nonzeros=8, dtype=np.float64):
+    """
+    Creates the operator named by kind ("gaussian", "dct" or "sparse-jl")
+    """
+    if (kind == "gaussian"):
+        return GaussianOperator(m, n, seed, dtype)
+    if (kind == "dct"):
+        return PartialDCTOperator(m, n, seed, dtype)
+    if (kind == "sparse-jl"):
+        return SparseJLOperator(m, n, nonzeros, seed, dtype)
+    raise ValueError("unknown operator: " + str(kind))
@@ -86,7 +86,7 @@ class Plot:
         returns: none 
         """
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.residual)
+        plt.plot(self.residual_iterations, self.residual)
         
         plt.xlabel("Number of iterations")
         plt.ylabel("Residual " + r"$||Ax-b||_{2}$")
@@ -101,7 +101,7 @@ class Plot:
         returns: none 
         """
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.moder)
+        plt.plot(self.moder_iterations, self.moder)
         
         plt.xlabel("Number of iterations")
         plt.ylabel("Model error " + r"$\frac{||x^*-x||_{2}}{||x^*||_{2}}$")
@@ -116,7 +116,7 @@ class Plot:
         returns: none 
         """
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.onenorm)
+        plt.plot(self.onenorm_iterations, self.onenorm)
         
         plt.xlabel("Number of iterations")
         plt.ylabel("1-norm " + r"$||x||_{1}$")
@@ -145,7 +145,7 @@ class Plot:
         returns: none 
         """
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.x_k)
+        plt.plot(self.iterations, self.x_k)
         
         plt.xlabel("Number of iterations")
         plt.ylabel(r"$x_k$")
@@ -162,7 +162,7 @@ class Plot:
             none 
         """
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.z_k)
+        plt.plot(self.iterations, self.z_k)
         
         plt.axhline(y=self.lmbda, linestyle="--")
         plt.axhline(y=-self.lmbda, linestyle="--")
@@ -175,8 +175,8 @@ class Plot:
         
     def plot_t_nonzeros(self):
         plt.clf()
-        plt.plot(range(1, self.max_iter+1), self.t_small, linestyle=":", label="Small value")
-        plt.plot(range(1, self.max_iter+1), self.t_large, linestyle=":", label="Large value")
+        plt.plot(self.iterations, self.t_small, linestyle=":", label="Small value")
+        plt.plot(self.iterations, self.t_large, linestyle=":", label="Large value")
         
         plt.legend()
         plt.xlabel("Number of iterations")
@@ -215,6 +215,10 @@ class Plot:
         self.z_k = results.get_z_history_nonzeros()
         self.t_small = results.get_t_history_small()
         self.t_large = results.get_t_history_large()
+        self.iterations = results.get_history_iterations()
+        self.residual_iterations = results.get_metric_iterations("residual")
+        self.onenorm_iterations = results.get_metric_iterations("onenorm")
+        self.moder_iterations = results.get_metric_iterations("moder")
         
     def update_algorithm(self, algorithm, results, thresholding, legend=None):
         self.residual = results.get_residuals()
@@ -226,6 +230,13 @@ class Plot:
         
         self.t_small = results.get_t_history_small()
         self.t_large = results.get_t_history_large()
+        # the run may have stopped before max_iter
+        self.max_iter = results.i
+        # the iterations the histories and metrics were recorded at
+        self.iterations = results.get_history_iterations()
+        self.residual_iterations = results.get_metric_iterations("residual")
+        self.onenorm_iterations = results.get_metric_iterations("onenorm")
+        self.moder_iterations = results.get_metric_iterations("moder")
         
         self.algorithm = algorithm 
         self.thresholding = thresholding 
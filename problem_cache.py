@@ -0,0 +1,126 @@
+"""
+On-disk cache of generated Ax = b problems, shared between runs as read-only memory maps
+@authors: Jimmy Singh and Janice Lee
+@date: July 10th, 2019
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+import init_problem as init
+
+# bump when the way problems are generated changes, so old files are not reused
+VERSION = 2
+
+# temporary directories older than this (in seconds) were left by builds that died
+STALE_SECONDS = 3600
+
+def get_key(m, n, sparse, noise, seed, dtype=np.float64):
+    """
+    Content address of a problem: a hash of everything that determines A, x_true and b
+    params:
+        m (int): rows of A
+        n (int): columns of A / rows of x and b
+        sparse (bool): true if the soln is sparse
+        noise (bool): true if the data contains noise
+        seed (int): the seed the problem is drawn with
+        dtype (dtype): the type A and b are stored in
+    returns:
+        the key (str)
+    """
+    desc = repr((VERSION, int(m), int(n), bool(sparse), bool(noise), int(seed), np.dtype(dtype).str))
+    return hashlib.sha1(desc.encode()).hexdigest()
+
+def get_size(path):
+    """
+    Total size in bytes of the files in a cache entry
+    """
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+def evict(cache_dir, max_bytes, keep=None):
+    """
+    Removes the least recently used problems until the cache fits in max_bytes, and
+    the temporary directories left by builds that died
+    params:
+        cache_dir (str): the cache directory
+        max_bytes (int): the size cap of the cache
+        keep (str): key of an entry that must not be removed
+    returns: none
+    """
+    entries = []
+    for key in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, key)
+        if (key.startswith(".") and os.path.isdir(path)):
+            # (a build in progress in another run is younger than STALE_SECONDS)
+            if (time.time() - os.path.getmtime(path) > STALE_SECONDS):
+                shutil.rmtree(path, ignore_errors=True)
+            continue
+        if (key.startswith(".") or not os.path.isdir(path)):
+            continue
+        entries.append((os.path.getmtime(path), key, get_size(path)))
+    total = sum(size for _, _, size in entries)
+    # oldest first
+    for _, key, size in sorted(entries):
+        if (total <= max_bytes):
+            break
+        if (key == keep):
+            continue
+        shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+        total -= size
+
+def load_l1(m, n, sparse, noise, seed, cache_dir, max_bytes, dtype=np.float64):
+    """
+    Gets the Ax = b problem for the given parameters, generating and storing it
+    in cache_dir the first time it is asked for. A and b are returned as read-only
+    memory maps of the stored .npy files, so every run using the same problem
+    shares one copy of them through the page cache.
+    params:
+        m (int): rows of A
+        n (int): columns of A / rows of x and b
+        sparse (bool): true if the soln is sparse
+        noise (bool): true if the data contains noise
+        seed (int): the seed the problem is drawn with
+        cache_dir (str): the cache directory
+        max_bytes (int): the size cap of the cache
+        dtype (dtype): the type A and b are stored in
+    returns:
+        A (memmap), x_true (array-like), b (memmap)
+    """
+    if (seed is None):
+        raise ValueError("a seed is needed to cache the problem")
+    key = get_key(m, n, sparse, noise, seed, dtype)
+    path = os.path.join(cache_dir, key)
+
+    if (not os.path.isdir(path)):
+        if (not os.path.exists(cache_dir)):
+            os.makedirs(cache_dir)
+        A, x_true, b = init.init_l1(m, n, None, None, sparse, noise, seed=seed, dtype=dtype)
+        # writes to a temporary directory first and renames it, so a problem is
+        # never seen half written
+        tmp = tempfile.mkdtemp(prefix="." + key, dir=cache_dir)
+        try:
+            np.save(os.path.join(tmp, "A.npy"), A)
+            np.save(os.path.join(tmp, "x_true.npy"), x_true)
+            np.save(os.path.join(tmp, "b.npy"), b)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        del A, b
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # another run stored the same problem first
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    # marks the problem as recently used
+    os.utime(path, None)
+    evict(cache_dir, max_bytes, keep=key)
+
+    A = np.load(os.path.join(path, "A.npy"), mmap_mode="r")
+    x_true = np.load(os.path.join(path, "x_true.npy"))
+    b = np.load(os.path.join(path, "b.npy"), mmap_mode="r")
+    return A, x_true, b
@@ -0,0 +1,110 @@
+"""
+Timers for the phases of the main loop of the solvers
+@authors: Jimmy Singh and Janice Lee
+@date: July 20th, 2019
+"""
+import json
+import time
+
+import numpy as np
+
+class Profiler:
+    """
+    Times the phases of each iteration. mark(phase) ends the phase that started at
+    the previous mark (or at begin()), so each phase costs one clock read.
+    params:
+        max_iter (int): most iterations that will be timed
+    """
+    def __init__(self, max_iter):
+        self.max_iter = max_iter
+        # phase -> time spent in it at each iteration (in seconds)
+        self.per_iteration = {}
+        # (phase, iteration, start, end) of every phase, for the trace
+        self.events = []
+        self.i = 0
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def begin(self, i):
+        """
+        Starts timing iteration i (starting at 1)
+        """
+        self.i = i
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """
+        Ends the current phase of the iteration
+        """
+        now = time.perf_counter()
+        if (phase not in self.per_iteration):
+            self.per_iteration[phase] = np.zeros(self.max_iter)
+        self.per_iteration[phase][self.i-1] += now - self.last
+        self.events.append((phase, self.i, self.last, now))
+        self.last = now
+
+    def get_totals(self):
+        """
+        The cumulative time spent in each phase (in seconds)
+        """
+        return {phase: float(np.sum(times)) for phase, times in self.per_iteration.items()}
+
+    def get_per_iteration(self, phase):
+        """
+        The time spent in a phase at each iteration that was run
+        """
+        return self.per_iteration[phase][:self.i]
+
+    def report(self):
+        """
+        Prints the cumulative time and share of each phase
+        """
+        totals = self.get_totals()
+        total = sum(totals.values())
+        for phase, seconds in sorted(totals.items(), key=lambda item: -item[1]):
+            print("%-12s %10.4f s %6.1f%%" % (phase, seconds, 100 * seconds / total))
+
+    def to_json(self, path):
+        """
+        Saves the cumulative and per-iteration times of each phase as JSON
+        """
+        data = {
+            "iterations": self.i,
+            "totals": self.get_totals(),
+            "per_iteration": {phase: self.get_per_iteration(phase).tolist()
+                              for phase in self.per_iteration},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def to_chrome_trace(self, path):
+        """
+        Saves the phases as a Chrome trace-event file (for chrome://tracing or Perfetto)
+        """
+        events = [{"name": phase, "cat": "solver", "ph": "X", "pid": 0, "tid": 0,
+                   "ts": 1e6 * (start - self.start), "dur": 1e6 * (end - start),
+                   "args": {"iteration": i}}
+                  for phase, i, start, end in self.events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+class NullProfiler:
+    """
+    Profiler that does nothing, used when profiling is off
+    """
+    def begin(self, i):
+        pass
+
+    def mark(self, phase):
+        pass
+
+def make_profiler(params):
+    """
+    A Profiler if params.profile is True, params.profile itself if it is a profiler
+    object (with begin() and mark()), otherwise a NullProfiler
+    """
+    if (params.profile is True):
+        return Profiler(params.max_iter)
+    if (params.profile):
+        return params.profile
+    return NullProfiler()
@@ -0,0 +1,162 @@
+"""
+Sources that read the rows of A and b sequentially in chunks, for problems too large to hold in memory
+@authors: Jimmy Singh and Janice Lee
+@date: July 11th, 2019
+"""
+import os
+
+import numpy as np
+
+class RowSource:
+    """
+    Reads the rows of A and b in order, one chunk at a time
+    Subclasses set m, n and dtype and implement readinto() and rewind(), and close()
+    if they hold files open
+    """
+    def readinto(self, A_buf, b_buf):
+        """
+        Reads the next rows of A and b into the start of the given buffers
+        params:
+            A_buf (array-like): buffer of shape (rows, n) to read rows of A into
+            b_buf (array-like): buffer of shape (rows, 1) to read rows of b into
+        returns:
+            the number of rows read (fewer than the buffer holds at the end of the data)
+        """
+        raise NotImplementedError
+
+    def rewind(self):
+        """
+        Goes back to the first row for the next pass over the data
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Releases what the source holds open (until the next rewind())
+        """
+        pass
+
+class ArraySource(RowSource):
+    """
+    Rows of an array that is in memory or memory mapped
+    """
+    def __init__(self, A, b):
+        self.A = A
+        self.b = b.reshape(-1, 1)
+        self.m, self.n = A.shape
+        self.dtype = A.dtype
+        self.pos = 0
+
+    def readinto(self, A_buf, b_buf):
+        rows = min(len(A_buf), self.m - self.pos)
+        A_buf[:rows] = self.A[self.pos:self.pos+rows]
+        b_buf[:rows] = self.b[self.pos:self.pos+rows]
+        self.pos += rows
+        return rows
+
+    def rewind(self):
+        self.pos = 0
+
+class NpySource(RowSource):
+    """
+    Rows of A and b stored as .npy files, read with plain sequential file reads
+    (rather than a memory map) so only the chunk being read is held in memory
+    """
+    def __init__(self, A_path, b_path):
+        self.A_path = A_path
+        self.b_path = b_path
+        self.A_file, self.A_offset, shape, self.dtype = self.open(A_path)
+        self.b_file, self.b_offset, b_shape, b_dtype = self.open(b_path)
+        self.m, self.n = shape
+        if (b_shape[0] != self.m):
+            raise ValueError("A and b have a different number of rows")
+        if (b_dtype != self.dtype):
+            raise ValueError("A and b must be stored with the same dtype")
+        self.rewind()
+
+    def open(self, path):
+        f = open(path, "rb")
+        version = np.lib.format.read_magic(f)
+        if (version == (1, 0)):
+            header = np.lib.format.read_array_header_1_0(f)
+        else:
+            header = np.lib.format.read_array_header_2_0(f)
+        shape, fortran_order, dtype = header
+        if (fortran_order):
+            raise ValueError(path + " must be stored in C order to be read by rows")
+        if (hasattr(os, "posix_fadvise")):
+            # lets the OS read ahead aggressively
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f, f.tell(), shape, dtype
+
+    def read(self, f, buf):
+        if (buf.size == 0):
+            return 0
+        view = memoryview(buf).cast("B")
+        done = 0
+        while (done < len(view)):
+            count = f.readinto(view[done:])
+            if (not count):
+                break
+            done += count
+        if (done != len(view)):
+            raise ValueError(f.name + " is truncated: read " + str(done) + " of "
+                             + str(len(view)) + " bytes")
+        return done
+
+    def readinto(self, A_buf, b_buf):
+        rows = min(len(A_buf), self.m - self.pos)
+        self.read(self.A_file, A_buf[:rows])
+        self.read(self.b_file, b_buf[:rows])
+        self.pos += rows
+        return rows
+
+    def rewind(self):
+        if (self.A_file.closed):
+            # reopens the files after close()
+            self.A_file = self.open(self.A_path)[0]
+            self.b_file = self.open(self.b_path)[0]
+        self.A_file.seek(self.A_offset)
+        self.b_file.seek(self.b_offset)
+        self.pos = 0
+
+    def close(self):
+        self.A_file.close()
+        self.b_file.close()
+
+class GeneratorSource(RowSource):
+    """
+    Rows produced by a generator of (A_chunk, b_chunk) pairs of any size
+    params:
+        factory (function): called with no arguments at the start of every pass,
+                returns an iterable of (A_chunk, b_chunk) pairs
+        n (int): columns of A
+        dtype (dtype): type of the entries of A and b
+    """
+    def __init__(self, factory, n, dtype=np.float64):
+        self.factory = factory
+        self.n = n
+        self.dtype = np.dtype(dtype)
+        self.rewind()
+
+    def readinto(self, A_buf, b_buf):
+        rows = 0
+        while (rows < len(A_buf)):
+            if (self.A_left is None or len(self.A_left) == 0):
+                chunk = next(self.chunks, None)
+                if (chunk is None):
+                    break
+                self.A_left = chunk[0]
+                self.b_left = chunk[1].reshape(-1, 1)
+            count = min(len(A_buf) - rows, len(self.A_left))
+            A_buf[rows:rows+count] = self.A_left[:count]
+            b_buf[rows:rows+count] = self.b_left[:count]
+            self.A_left = self.A_left[count:]
+            self.b_left = self.b_left[count:]
+            rows += count
+        return rows
+
+    def rewind(self):
+        self.chunks = iter(self.factory())
+        self.A_left = None
+        self.b_left = None
@@ -6,87 +6,75 @@ from adagrad_lb_modified import *
 from adam import *  
 from adam_lb_classic import * 
 from adam_lb_modified import *
+from accelerated_lb import *
+from fista import *
+from svrg_lb_classic import *
+from svrg_lb_modified import *
+from saga_lb_classic import *
+from saga_lb_modified import *
+import solver
 import plot 
-import numpy as np 
 import matplotlib.pyplot as mat
 mat.style.use('seaborn-poster')
 mat.style.use('ggplot')
-np.random.seed(0)
 
-def run(params, plt, lbc, lbm, lbm_wf, adag, adag_lbc, adag_lbm, adag_lbm_wf, adm, adam_lbc, adam_lbm, adam_lbm_wf):    
-    # ------ EXECUTE AND PLOT------
-    algs = {}
-    if (lbc):
-        alg = "lb-classic"
-        algs[alg] = lb_classic(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
-        
-    if (lbm):
-        alg = "lb-modified"
-        params.flipping = False
-        algs[alg] = lb_modified(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
+def run(params, plt, lbc, lbm, lbm_wf, adag, adag_lbc, adag_lbm, adag_lbm_wf, adm, adam_lbc, adam_lbm, adam_lbm_wf, lockstep=True,
+        acc_lb=False, acc_ista=False, svrg_lbc=False, svrg_lbm=False, saga_lbc=False, saga_lbm=False):    
+    """
+    Runs the flagged algorithms, plotting the ADAGRAD variants
+    With lockstep, all of them run together on one problem and see the same samples
+    (see solver.solve_lockstep); otherwise each one runs on its own problem
+    acc_lb and acc_ista also run accelerated LB and FISTA, and svrg_lbc, svrg_lbm, saga_lbc
+    and saga_lbm the variance reduced LB
+    """
+    # ------ CHOOSING VARIANTS ------
+    # (name, flag, step rule, thresholding, flipping, plot)
+    classic = lambda: solver.ClassicStep(params)
+    adagrad_step = lambda: solver.AdagradStep(params)
+    adam_step = lambda: solver.AdamStep(params)
+    modified = lambda base: (lambda: solver.ModifiedStep(params, base()))
+    accelerated = lambda proximal: (lambda: solver.AcceleratedStep(params, classic(), proximal))
+    reduced = lambda base, kind: (lambda: solver.VarianceReducedStep(params, base(), kind))
+    table = [
+        ("lb-classic", lbc, classic, True, False, False),
+        ("lb-modified", lbm, modified(classic), True, False, False),
+        ("lb-modified-w-flipping", lbm_wf, modified(classic), True, True, False),
+        ("adagrad", adag, adagrad_step, False, False, True),
+        ("adagrad-lb-classic", adag_lbc, adagrad_step, True, False, True),
+        ("adagrad-lb-modified", adag_lbm, modified(adagrad_step), True, False, True),
+        ("adagrad-lb-modified-w-flipping", adag_lbm_wf, modified(adagrad_step), True, True, True),
+        ("adam", adm, adam_step, False, False, False),
+        ("adam-lb-classic", adam_lbc, adam_step, True, False, False),
+        ("adam-lb-modified", adam_lbm, modified(adam_step), True, False, False),
+        ("adam-lb-modified-w-flipping", adam_lbm_wf, modified(adam_step), True, True, False),
+        ("accelerated-lb", acc_lb, accelerated(False), True, False, False),
+        ("fista", acc_ista, accelerated(True), True, False, False),
+        ("svrg-lb-classic", svrg_lbc, reduced(classic, "svrg"), True, False, False),
+        ("svrg-lb-modified", svrg_lbm, reduced(modified(classic), "svrg"), True, False, False),
+        ("saga-lb-classic", saga_lbc, reduced(classic, "saga"), True, False, False),
+        ("saga-lb-modified", saga_lbm, reduced(modified(classic), "saga"), True, False, False),
+    ]
+    variants = []
+    for name, flag, make_rule, thresholding, flipping, plotted in table:
+        if (flag):
+            params.flipping = flipping
+            variants.append((name, make_rule(), thresholding, plotted))
     
-    if (lbm_wf):
-        alg = "lb-modified-w-flipping"
-        params.flipping = True
-        algs[alg] = adam_lb_modified(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
-        
-    if (adag):
-        alg = "adagrad"
-        algs[alg] = adagrad(params)
-        plt.update_algorithm(alg, algs[alg], thresholding=False)
-        plt.plot_all()
-        
-    if (adag_lbc):
-        alg = "adagrad-lb-classic"
-        algs[alg] = adagrad_lb_classic(params)
-        plt.update_algorithm(alg, algs[alg], thresholding=True)
-        plt.plot_all()
-        
-    if (adag_lbm):
-        alg = "adagrad-lb-modified"
-        params.flipping = False 
-        algs[alg] = adagrad_lb_modified(params)
-        plt.update_algorithm(alg, algs[alg], thresholding=True)
-        plt.plot_all()
+    # ------ EXECUTE ------
+    algs = {}
+    if (lockstep):
+        results = solver.solve_lockstep(params, [(rule, thresholding, [params.lmbda]) for _, rule, thresholding, _ in variants])
+        for (name, _, _, _), alg_results in zip(variants, results):
+            algs[name] = alg_results[0]
+    else:
+        for name, rule, thresholding, _ in variants:
+            algs[name] = solver.solve(params, rule, thresholding)
     
-    if (adag_lbm_wf):
-        alg = "adagrad-lb-modified-w-flipping"
-        params.flipping = True 
-        algs[alg] = adagrad_lb_modified(params)
-        plt.update_algorithm(alg, algs[alg], thresholding=True)
-        plt.plot_all()
-        
-    if (adm):
-        alg = "adam"
-        algs[alg] = adam(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=False)
-        # plt.plot_all()
-        
-    if (adam_lbc):
-        alg = "adam-lb-classic"
-        algs[alg] = adam_lb_classic(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
-        
-    if (adam_lbm):
-        alg = "adam-lb-modified"
-        params.flipping = False
-        algs[alg] = adam_lb_modified(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
-        
-    if (adam_lbm_wf):
-        alg = "adam-lb-modified-w-flipping"
-        params.flipping = True
-        algs[alg] = adam_lb_modified(params)
-        # plt.update_algorithm(alg, algs[alg], thresholding=True)
-        # plt.plot_all()
+    # ------ PLOT ------
+    for name, rule, thresholding, plotted in variants:
+        if (plotted):
+            plt.update_algorithm(name, algs[name], thresholding=thresholding)
+            plt.plot_all()
     
     return algs
 
@@ -131,7 +119,7 @@ def main():
     
     mat.clf()
     for alg in algs.values(): 
-        mat.plot(range(1, 301), alg.moder)
+        mat.plot(alg.get_metric_iterations("moder"), alg.moder)
     mat.xlabel("Number of iterations", size=20)
     mat.ylabel("Model error " + r"$\frac{||x^*-x||_{2}}{||x^*||_{2}}$", size=20)
     
@@ -141,7 +129,7 @@ def main():
 
     mat.clf()
     for alg in algs.values(): 
-        mat.plot(range(1, 301), alg.residuals)
+        mat.plot(alg.get_metric_iterations("residual"), alg.residuals)
     mat.xlabel("Number of iterations", size=20)
     mat.ylabel("Residual " + r"$\frac{||Ax-b||_{2}}{||b||_2}$", size=20)
     
@@ -161,7 +149,7 @@ def main():
     i = 0
     for alg in algs.values(): 
         mat.clf()
-        mat.plot(range(1, 301), alg.get_z_history_nonzeros())
+        mat.plot(alg.get_history_iterations(), alg.get_z_history_nonzeros())
         
         mat.xlabel("Number of iterations", size=20)
         mat.ylabel(r"$z_k$", size=20)
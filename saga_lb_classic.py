@@ -0,0 +1,35 @@
+"""
+Executes the classic Linearized Bregman with SAGA variance reduction (a memory of the residual of every row)
+@authors: Jimmy Singh and Janice Lee
+@date: July 29th, 2019
+"""
+import set_params
+import solver
+import plot
+
+def saga_lb_classic(params, problem=None):
+    """
+    Executes classic Linearized Bregman with SAGA variance reduction
+    params:
+        params (Params object): contains parameters for optimization
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem
+    returns:
+        results (Results object): contains the arrays
+                with the results of the optimization
+    """
+    rule = solver.VarianceReducedStep(params, solver.ClassicStep(params), "saga")
+    return solver.solve(params, rule, thresholding=True, problem=problem)
+
+def main():
+    # ------ CONFIGURE PARAMETERS ------
+    params = set_params.Params()
+    # ------ EXECUTE ------
+    results = saga_lb_classic(params)
+    # ------ PLOT ------
+    algorithm = "saga-lb-classic"
+    plt = plot.Plot(params)
+    plt.update_algorithm(algorithm, results, thresholding=True)
+    plt.plot_all()
+
+if __name__ == "__main__":
+    main()
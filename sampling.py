@@ -0,0 +1,374 @@
+"""
+Samplers that choose the rows of A and b used at each iteration
+@authors: Jimmy Singh and Janice Lee
+@date: July 9th, 2019
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import operators
+import row_source
+
+# most random indices the PermutationSampler draws at once
+BULK_INDICES = 2**20
+
+class PermutationSampler:
+    """
+    Samples num_samp rows by taking the start of a random permutation of n indices,
+    as in the original algorithms (only the first n rows of A can be drawn). The
+    permutations of the next BULK_INDICES / n iterations are drawn in one call.
+    Samplers draw from their own np.random.Generator (rng); state names what else a
+    checkpoint needs to continue drawing the same samples (see checkpoint.py).
+    last_rows holds the rows of the last sample, as indices into get_rows().
+    """
+    state = ("idx", "k")
+
+    def __init__(self, A, b, num_samp, rng):
+        self.A = A
+        self.b = b
+        self.num_samp = num_samp
+        self.rng = rng
+        # the samples of the next iterations (one per row) and the next one to use
+        self.idx = np.zeros((0, num_samp), dtype=int)
+        self.k = 0
+        # preallocated buffers for the sampled rows (the rows of a sparse A are
+        # gathered into a new sparse matrix instead)
+        self.sparse = operators.is_sparse(A)
+        if (not self.sparse):
+            self.A_sub = np.zeros((num_samp, A.shape[1]), dtype=A.dtype)
+        self.b_sub = np.zeros((num_samp, 1), dtype=b.dtype)
+
+    def sample(self):
+        """
+        Gets the rows of A and b for the next iteration
+        params: none
+        returns:
+            A_sub (array-like): the sampled rows of A
+            b_sub (array-like): the corresponding rows of b
+        """
+        return self.sample_into(None if self.sparse else self.A_sub, self.b_sub)
+
+    def sample_into(self, A_sub, b_sub):
+        """
+        Gets the rows of A and b for the next iteration into the given buffers
+        params:
+            A_sub (array-like): num_samp x n buffer for the rows of A (None if A is sparse)
+            b_sub (array-like): num_samp x 1 buffer for the rows of b
+        returns:
+            A_sub, b_sub
+        """
+        # choosing random rows of A
+        if (self.k == len(self.idx)):
+            self.draw()
+        idx = self.idx[self.k]
+        self.k += 1
+        self.last_rows = idx
+        # getting the corresponding rows of A and b (the indices are valid, and with
+        # mode="clip" np.take writes straight into the buffers instead of through a copy)
+        np.take(self.b, idx, axis=0, out=b_sub, mode="clip")
+        if (self.sparse):
+            return self.A[idx], b_sub
+        np.take(self.A, idx, axis=0, out=A_sub, mode="clip")
+        return A_sub, b_sub
+
+    def draw(self):
+        """
+        Draws the samples of the next iterations, each the start of a permutation
+        """
+        n = self.A.shape[1]
+        rows = max(1, BULK_INDICES // n)
+        perms = self.rng.permuted(np.tile(np.arange(n), (rows, 1)), axis=1)
+        self.idx = np.ascontiguousarray(perms[:, :self.num_samp])
+        self.k = 0
+
+    def get_rows(self):
+        """
+        The rows of A and b that samples are drawn from
+        """
+        n = self.A.shape[1]
+        return self.A[:n], self.b[:n]
+
+def permute_rows(A, perm):
+    """
+    Reorders the rows of A in place so that row i becomes the old row perm[i], moving
+    the rows along the cycles of perm with one row of extra memory
+    """
+    done = np.zeros(len(perm), dtype=bool)
+    row = np.zeros(A.shape[1:], dtype=A.dtype)
+    for start in range(len(perm)):
+        if (done[start]):
+            continue
+        row[...] = A[start]
+        i = start
+        while (True):
+            done[i] = True
+            j = perm[i]
+            if (j == start):
+                A[i] = row
+                break
+            A[i] = A[j]
+            i = j
+
+class ShuffleSampler:
+    """
+    Shuffles the rows of A and b once, then walks through them in contiguous blocks
+    of num_samp rows. Each epoch visits the blocks in a new random order, starting
+    from a new random offset below num_samp, so the blocks shift from one epoch to
+    the next (the rows before the offset and after the last whole block are left out
+    of that epoch).
+    A writeable A and b are shuffled in place, with one row of extra memory, and the
+    sampled rows are slices (views) of them, so nothing is copied per iteration;
+    close() puts the rows back in their original order (a run that fails leaves
+    them shuffled).
+    A read-only A (such as a cached problem or the shared memory of a sweep) or a
+    scipy.sparse A is not shuffled: the rows of each block are gathered through the
+    same shuffle into preallocated buffers (a new CSR matrix for a sparse A), so the
+    samples are the same as for a writeable A.
+    """
+    state = ("starts", "k")
+
+    def __init__(self, A, b, num_samp, rng):
+        m = A.shape[0]
+        self.num_samp = num_samp
+        self.rng = rng
+        if (operators.is_sparse(A)):
+            A = A.tocsr()
+        self.A = A
+        self.b = b
+        self.sparse = operators.is_sparse(A)
+        self.perm = rng.permutation(m)
+        self.in_place = not self.sparse and A.flags.writeable and b.flags.writeable
+        if (self.in_place):
+            permute_rows(A, self.perm)
+            permute_rows(b, self.perm)
+        else:
+            # preallocated buffers for the gathered rows (as in PermutationSampler)
+            if (not self.sparse):
+                self.A_sub = np.zeros((num_samp, A.shape[1]), dtype=A.dtype)
+            self.b_sub = np.zeros((num_samp, 1), dtype=b.dtype)
+        self.starts = np.zeros(0, dtype=int)
+        self.k = 0
+
+    def new_epoch(self):
+        """
+        Draws the offset and order of the blocks of rows for the next epoch
+        """
+        m = self.A.shape[0]
+        offset = self.rng.integers(min(self.num_samp, m - self.num_samp + 1))
+        num_blocks = (m - offset) // self.num_samp
+        self.starts = offset + self.num_samp * self.rng.permutation(num_blocks)
+        self.k = 0
+
+    def sample(self):
+        if (self.in_place):
+            return self.sample_into(None, None)
+        return self.sample_into(None if self.sparse else self.A_sub, self.b_sub)
+
+    def sample_into(self, A_sub, b_sub):
+        """
+        Gets the rows of A and b for the next iteration, copied into the given buffers
+        unless they are None (a shuffled A returns slices of itself, a read-only or
+        sparse A needs the buffers to gather into)
+        """
+        if (self.k == len(self.starts)):
+            self.new_epoch()
+        start = self.starts[self.k]
+        self.k += 1
+        if (self.in_place):
+            # the rows are identified by where they are in the shuffled A
+            self.last_rows = np.arange(start, start+self.num_samp)
+            A_block = self.A[start:start+self.num_samp]
+            b_block = self.b[start:start+self.num_samp]
+            if (b_sub is None):
+                return A_block, b_block
+            np.copyto(b_sub, b_block)
+            if (A_sub is None):
+                return A_block, b_sub
+            np.copyto(A_sub, A_block)
+            return A_sub, b_sub
+        # the rows are identified by their index in A
+        idx = self.perm[start:start+self.num_samp]
+        self.last_rows = idx
+        np.take(self.b, idx, axis=0, out=b_sub, mode="clip")
+        if (self.sparse):
+            return self.A[idx], b_sub
+        np.take(self.A, idx, axis=0, out=A_sub, mode="clip")
+        return A_sub, b_sub
+
+    def get_rows(self):
+        return self.A, self.b
+
+    def close(self):
+        """
+        Puts the rows of a shuffled A and b back in their original order
+        """
+        if (self.in_place):
+            inverse = np.argsort(self.perm)
+            permute_rows(self.A, inverse)
+            permute_rows(self.b, inverse)
+            self.in_place = False
+
+class StreamSampler:
+    """
+    Reads A and b from a row source one chunk of chunk_rows rows at a time, in order,
+    and serves the blocks of num_samp rows within each chunk in a random order.
+    Only the current chunk is held in memory, so memory use depends on chunk_rows
+    rather than on m.
+    Every run reads the source from its first chunk (a run resumed from a checkpoint
+    too), and close() closes the source at the end of the run.
+    """
+    state = ()
+
+    def __init__(self, source, num_samp, chunk_rows, rng):
+        self.source = source
+        self.num_samp = num_samp
+        self.rng = rng
+        # a whole number of blocks per chunk
+        chunk_rows = max(num_samp, chunk_rows - chunk_rows % num_samp)
+        self.A_chunk = np.zeros((chunk_rows, source.n), dtype=source.dtype)
+        self.b_chunk = np.zeros((chunk_rows, 1), dtype=source.dtype)
+        self.starts = np.zeros(0, dtype=int)
+        self.k = 0
+        source.rewind()
+
+    def close(self):
+        self.source.close()
+
+    def get_rows(self):
+        raise ValueError("the rows of a streamed A are not held in memory")
+
+    def next_chunk(self):
+        """
+        Reads the next chunk of rows, starting a new pass over the data at the end
+        """
+        rows = self.source.readinto(self.A_chunk, self.b_chunk)
+        if (rows < self.num_samp):
+            self.source.rewind()
+            rows = self.source.readinto(self.A_chunk, self.b_chunk)
+            if (rows < self.num_samp):
+                raise ValueError("the row source has fewer than num_samp rows")
+        self.starts = self.num_samp * self.rng.permutation(rows // self.num_samp)
+        self.k = 0
+
+    def sample(self):
+        if (self.k == len(self.starts)):
+            self.next_chunk()
+        start = self.starts[self.k]
+        self.k += 1
+        return self.A_chunk[start:start+self.num_samp], self.b_chunk[start:start+self.num_samp]
+
+    def sample_into(self, A_sub, b_sub):
+        A_block, b_block = self.sample()
+        np.copyto(A_sub, A_block)
+        np.copyto(b_sub, b_block)
+        return A_sub, b_sub
+
+class OperatorSampler:
+    """
+    Samples num_samp rows of a matrix-free operator at a time, taking them in the
+    order of a new permutation of all m rows every epoch
+    """
+    state = ("order", "k")
+
+    def __init__(self, A, b, num_samp, rng):
+        self.A = A
+        self.b = b
+        self.num_samp = num_samp
+        self.rng = rng
+        # preallocated buffer for the sampled rows of b
+        self.b_sub = np.zeros((num_samp, 1), dtype=b.dtype)
+        self.order = np.zeros(0, dtype=int)
+        self.k = 0
+
+    def sample(self):
+        return self.sample_into(None, self.b_sub)
+
+    def sample_into(self, A_sub, b_sub):
+        # A_sub is only used by operators that give their rows as a dense block
+        if (self.k + self.num_samp > len(self.order)):
+            self.order = self.rng.permutation(self.A.shape[0])
+            self.k = 0
+        idx = self.order[self.k:self.k+self.num_samp]
+        self.k += self.num_samp
+        self.last_rows = idx
+        np.take(self.b, idx, axis=0, out=b_sub, mode="clip")
+        return self.A.rows(idx, out=A_sub), b_sub
+
+    def get_rows(self):
+        return self.A, self.b
+
+class PrefetchSampler:
+    """
+    Wraps another sampler to gather the rows of the next iteration in a worker thread
+    while the current iteration computes on its rows. The rows are gathered into two
+    preallocated pairs of buffers in turn: the rows returned by sample() stay valid
+    until the following call, while the worker fills the other pair. NumPy releases
+    the GIL while it copies, so the gather (or the reads of a memmapped or streamed A)
+    overlaps with the products with A_sub.
+    The worker draws the samples in the same order as the wrapped sampler would, so
+    the iterates are the same as without prefetching (the worker draws one sample
+    ahead, which is left unused at the end of the run).
+    params:
+        sampler (sampler object): the sampler to prefetch from (with sample_into())
+        num_samp (int): rows per sample
+        n (int): columns of A
+        dtype (numpy dtype): type of A and b
+        dense (bool): false if the rows of A are not gathered into a dense buffer
+                (a scipy.sparse A), so only b_sub is buffered
+    """
+    def __init__(self, sampler, num_samp, n, dtype, dense=True):
+        self.sampler = sampler
+        self.buffers = [(np.zeros((num_samp, n), dtype=dtype) if dense else None,
+                         np.zeros((num_samp, 1), dtype=dtype)) for k in range(2)]
+        self.k = 0
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = self.executor.submit(self.sampler.sample_into, *self.buffers[0])
+
+    def sample(self):
+        A_sub, b_sub = self.pending.result()
+        # (a StreamSampler has no rows to index into, see get_rows())
+        self.last_rows = getattr(self.sampler, "last_rows", None)
+        # starts gathering the next sample into the other buffers
+        self.k = 1 - self.k
+        self.pending = self.executor.submit(self.sampler.sample_into, *self.buffers[self.k])
+        return A_sub, b_sub
+
+    def get_rows(self):
+        return self.sampler.get_rows()
+
+    def close(self):
+        """
+        Stops the worker thread (after it finishes the sample in progress) and closes
+        the wrapped sampler
+        """
+        self.executor.shutdown(wait=True)
+        if (hasattr(self.sampler, "close")):
+            self.sampler.close()
+
+def make_sampler(params, A, b, rng):
+    """
+    Creates the sampler chosen by params.sampling
+    params:
+        params (Params object): contains parameters for optimization
+        A (array-like, RowSource or LinearOperator): the m x n matrix (dense or scipy.sparse),
+                a source to stream its rows from or a matrix-free operator
+        b (array-like): the m x 1 right hand side (None if A is a RowSource)
+        rng (np.random.Generator): the generator the samples are drawn from
+    returns:
+        the sampler object (a PrefetchSampler around it if params.prefetch is true)
+    """
+    if (isinstance(A, row_source.RowSource)):
+        sampler = StreamSampler(A, params.num_samp, params.chunk_rows, rng)
+    elif (isinstance(A, operators.LinearOperator)):
+        sampler = OperatorSampler(A, b, params.num_samp, rng)
+    elif (params.sampling == "permutation"):
+        sampler = PermutationSampler(A, b, params.num_samp, rng)
+    elif (params.sampling == "shuffle"):
+        sampler = ShuffleSampler(A, b, params.num_samp, rng)
+    else:
+        raise ValueError("unknown sampling mode: " + str(params.sampling))
+    if (params.prefetch):
+        n = A.n if isinstance(A, row_source.RowSource) else A.shape[1]
+        return PrefetchSampler(sampler, params.num_samp, n, A.dtype, not operators.is_sparse(A))
+    return sampler
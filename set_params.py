@@ -12,10 +12,91 @@ class Params:
             epsilon (float): a small constant to avoid division by zero in calculation of step size 
             beta_1 (float): used for exponentially moving average of the gradient mean in ADAM
             beta_2 (float): used for exponentially moving average of the gradient variance in ADAM
+            restart (str): when to reset the momentum of accelerated LB and FISTA
+                "residual": when the residual of the sampled rows grows (stable with small samples)
+                "gradient": when a step goes against the last change (the classic test, for large
+                    samples; FISTA can diverge with it on small samples)
+                None: only every restart_every iterations
+            restart_every (int): iterations between restarts of the momentum of accelerated LB and
+                FISTA, None to only restart adaptively
+            snapshot_every (int): iterations between the full gradients of SVRG, None for one per pass
+                over the rows that are sampled from
             
             sparse (bool): true if the soln is sparse 
             noise (bool): true if the data contains noise 
             flipping (bool): true if step sizes should only be updated when values cross threshold
+            
+            sampling (str): how rows of A and b are sampled at each iteration
+                "shuffle": blocks of a new shuffle of the m rows every epoch, covering all m rows
+                "permutation": the start of a random permutation of n indices (original behavior)
+            checkpoint_dir (str): directory to save checkpoints of the run in (see checkpoint.py),
+                None to disable
+            checkpoint_every (int): iterations between checkpoints (the last iteration is always saved)
+            resume (bool): true to resume from the latest checkpoint in checkpoint_dir, if there is one
+                (the run must have the same parameters, problem and variants)
+            warm_start (str): checkpoint (or directory of checkpoints) to take the starting x_k and z_k
+                from, None to start from zeros; the thresholding parameters and data may differ
+            prefetch (bool): true to gather the rows of the next iteration in a worker thread
+                while the current iteration computes (same iterates, see sampling.PrefetchSampler);
+                pays off when gathering rows is slow (a large, streamed or memmapped A or an
+                operator)
+            
+            seed (int): seed the problem (and, unless sample_seed is set, the samples) are drawn
+                with, None to draw them from fresh entropy
+            sample_seed (int or np.random.Generator): seed (or generator) of the samples the solvers
+                draw, None to use seed
+            cache_dir (str): directory to cache generated problems in (needs a seed), None to disable
+            cache_max_bytes (int): size cap of the cache, least recently used problems are removed first
+            chunk_rows (int): rows of A read at a time when streaming A from a row source
+            operator (str): None to store A, or a matrix-free A that regenerates its rows
+                from the seed: "gaussian", "dct" (randomized partial DCT) or "sparse-jl"
+            operator_nonzeros (int): nonzeros per row of the "sparse-jl" operator
+            density (float): None for a dense A, or the fraction of nonzeros of a scipy.sparse
+                CSR A (not cached)
+            
+            dtype (str): type A and b are generated and stored in, and the products with A are
+                computed in ("float64" or "float32", which halves the memory and bandwidth of A);
+                the solvers use the type of the A they are given
+            state_dtype (str): type of z_k and of the state of the step rules (tau, the ADAGRAD and
+                ADAM accumulators), None for the type of A ("float64" with a float32 A accumulates
+                in double precision)
+                Against float64 on the default 20000 x 2000 problems, the model error after 300
+                iterations moves by up to about 3e-6 in float32, and 1e-8 with a float64 state_dtype
+            
+            active_set_density (float): largest fraction of nonzeros in x_k for which the residual
+                only multiplies the columns of A where x_k is nonzero (0 to always use all of A);
+                with 200 x 2000 samples it breaks even with the full product at about 0.09
+            
+            stop_rel_change (float): stop once ||z_k - z_(k-1)|| / ||z_k|| is below this, None to disable
+            stop_plateau_window (int): stop once the mean residual over this many iterations has not
+                decreased by stop_plateau_tol (relatively) from the window before it, None to disable
+            stop_plateau_tol (float): relative decrease of the residual the plateau test asks for
+            stop_moder (float): stop once the model error is at most this, None to disable
+            stop_residual (float): stop once the residual is at most this, None to disable
+            stop_support_window (int): stop once the support of x_k has not changed for this many
+                iterations, None to disable
+            max_seconds (float): wall-clock budget of a run in seconds, None for no limit
+            max_passes (float): budget of a run in passes over the m rows of A, None for no limit
+            
+            history (str): which values of x_k, z_k and t_k the results keep
+                "coords": every iteration at history_coords (the plotted coordinates by default)
+                "full": every coordinate at every iteration (max_iter x n per array)
+                "every": every coordinate every history_every iterations
+                "sparse": x_k as the (index, value) entries that changed at each iteration,
+                    z_k and t_k as for "coords"
+                "none": nothing
+            history_every (int): iterations between the states kept by "every"
+            history_coords (array-like): coordinates kept by "coords" and "sparse", None for
+                the first 25 nonzeros of x_true
+            history_recent (int): number of the most recent states to also keep, in a ring buffer
+            
+            metrics (dict): metrics the results compute (see metrics.py) -> how often: every k
+                iterations (an int k) or "final" for only the last iteration; the others can
+                still be computed from the last iteration with Results.evaluate()
+            
+            profile (bool): true to time each phase of the main loop (see profiler.py),
+                or a profiler object to time them with
+            verbose (bool): true to print each iteration
         """
         self.m = 20000
         self.n = 2000
@@ -27,7 +108,53 @@ class Params:
         self.epsilon = 1e-6
         self.beta_1 = .9
         self.beta_2 = .999
+        
+        self.restart = "residual"
+        self.restart_every = 25
+        self.snapshot_every = None
 
         self.sparse = False   
         self.noise = True
         self.flipping = False
+        
+        self.sampling = "shuffle"
+        self.prefetch = False
+        
+        self.checkpoint_dir = None
+        self.checkpoint_every = 1000
+        self.resume = False
+        self.warm_start = None
+        
+        self.seed = 0
+        self.sample_seed = None
+        self.cache_dir = None
+        self.cache_max_bytes = 4 * 2**30
+        self.chunk_rows = 10000
+        
+        self.operator = None
+        self.operator_nonzeros = 8
+        self.density = None
+        
+        self.dtype = "float64"
+        self.state_dtype = None
+        
+        self.active_set_density = 0.05
+        
+        self.stop_rel_change = None
+        self.stop_plateau_window = None
+        self.stop_plateau_tol = 1e-3
+        self.stop_moder = None
+        self.stop_residual = None
+        self.stop_support_window = None
+        self.max_seconds = None
+        self.max_passes = None
+        
+        self.history = "coords"
+        self.history_every = 10
+        self.history_coords = None
+        self.history_recent = 0
+        
+        self.metrics = {"residual": 1, "onenorm": 1, "moder": 1}
+        
+        self.profile = False
+        self.verbose = True
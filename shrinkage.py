@@ -0,0 +1,78 @@
+"""
+Soft thresholding (shrinkage) shared by the algorithms, with a fused z update and
+an optional Numba kernel
+@authors: Jimmy Singh and Janice Lee
+@date: July 23rd, 2019
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# set to False to always use the NumPy path
+USE_NUMBA = numba is not None
+
+def soft_threshold(z, lmbda, out=None, support=None):
+    """
+    Replaces values in z that are less than lambda with 0 and shrinks the others by lambda
+    params:
+        z (array-like): the array to threshold
+        lmbda (float or array-like): the value to threshold by (one per column of z)
+        out (array-like): preallocated array to hold the thresholded values, None to allocate one
+        support (array-like): preallocated boolean array to hold where out is nonzero, None to skip
+    returns:
+        out, holding the thresholded array
+    """
+    if (out is None):
+        out = np.empty_like(z)
+    np.absolute(z, out=out)
+    np.subtract(out, lmbda, out=out)
+    np.maximum(out, 0, out=out)
+    if (support is not None):
+        np.greater(out, 0, out=support)
+    np.copysign(out, z, out=out)
+    return out
+
+if (numba is not None):
+    @numba.njit(cache=True)
+    def fused_kernel(z, update, lmbda, out, support, write_support):
+        n, K = z.shape
+        for i in range(n):
+            for j in range(K):
+                value = z[i, j] - update[i, j]
+                z[i, j] = value
+                shrunk = abs(value) - lmbda[j]
+                if (shrunk > 0):
+                    out[i, j] = shrunk if value > 0 else -shrunk
+                else:
+                    out[i, j] = 0.0
+                if (write_support):
+                    support[i, j] = shrunk > 0
+
+    # passed as the support when it is not wanted
+    no_support = np.zeros((1, 1), dtype=bool)
+
+def update_threshold(z, update, lmbda, out, support=None):
+    """
+    Updates z -= update in place and thresholds the new z into out, in one pass over
+    the arrays with the Numba kernel (when Numba is installed and the arrays are 2-D)
+    params:
+        z (array-like): the array to update and threshold
+        update (array-like): the array to subtract from z
+        lmbda (float or array-like): the value to threshold by (one per column of z)
+        out (array-like): preallocated array to hold the thresholded values
+        support (array-like): preallocated boolean array to hold where out is nonzero, None to skip
+    returns:
+        out, holding the thresholded array
+    """
+    if (USE_NUMBA and z.ndim == 2):
+        lmbdas = np.broadcast_to(np.asarray(lmbda, dtype=z.dtype).reshape(-1), (z.shape[1],))
+        if (support is None):
+            fused_kernel(z, update, lmbdas, out, no_support, False)
+        else:
+            fused_kernel(z, update, lmbdas, out, support, True)
+        return out
+    z -= update
+    return soft_threshold(z, lmbda, out=out, support=support)
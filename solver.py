@@ -0,0 +1,783 @@
+"""
+Core engine shared by the Linearized Bregman, ADAGRAD and ADAM variants
+@authors: Jimmy Singh and Janice Lee
+@date: July 8th, 2019
+"""
+import numpy as np
+
+import init_problem as init
+import problem_cache
+import get_results
+import history
+import operators
+import profiler
+import checkpoint
+import sampling
+import shrinkage
+import stopping
+
+def residual_matvec(A_sub, x_k, support, max_density, out, buffers=None):
+    """
+    Computes A_sub * x_k into out. When x_k is sparse, only the columns of A_sub where
+    some column of x_k is nonzero are multiplied (the active set).
+    params:
+        A_sub (array-like): the sampled rows of A
+        x_k (array-like): n x K array
+        support (array-like): n x K boolean array, true where x_k may be nonzero
+        max_density (float): largest fraction of nonzero rows of x_k to use the active set for
+        out (array-like): preallocated array to hold the product
+        buffers (tuple): flat arrays of at least max_density * n * num_samp and
+                max_density * n * K entries to gather the active columns of A_sub and
+                rows of x_k into, None to allocate them
+    returns:
+        out, holding the product
+    """
+    n = x_k.shape[0]
+    if (max_density > 0 and isinstance(A_sub, np.ndarray)):
+        if (support.shape[1] == 1):
+            active = np.flatnonzero(support)
+        else:
+            active = np.flatnonzero(support.any(axis=1))
+        k = len(active)
+        if (k <= max_density * n):
+            if (buffers is None):
+                return np.dot(np.take(A_sub, active, axis=1), np.take(x_k, active, axis=0), out=out)
+            A_active = buffers[0][:A_sub.shape[0] * k].reshape(A_sub.shape[0], k)
+            x_active = buffers[1][:k * x_k.shape[1]].reshape(k, x_k.shape[1])
+            np.take(A_sub, active, axis=1, out=A_active, mode="clip")
+            np.take(x_k, active, axis=0, out=x_active, mode="clip")
+            return np.dot(A_active, x_active, out=out)
+    return operators.matvec(A_sub, x_k, out=out)
+
+def get_block(A, start, end, out=None):
+    """
+    Rows start to end of A, a dense or scipy.sparse matrix or an operators.LinearOperator
+    (whose rows are written into out when it gives them as a dense block)
+    """
+    if (isinstance(A, operators.LinearOperator)):
+        return A.rows(np.arange(start, end), out=out)
+    return A[start:end]
+
+def full_gradient(A, b, x, out, block_rows=1000):
+    """
+    Computes the gradient over every row, A.T * (A * x - b), into out, a block of rows
+    of A at a time
+    """
+    out[...] = 0
+    m = A.shape[0]
+    # a buffer of its own for the rows of an operator, which may otherwise reuse the
+    # block of rows the solver is working on
+    buffer = np.zeros((min(block_rows, m), A.shape[1]), dtype=A.dtype)
+    for start in range(0, m, block_rows):
+        end = min(start + block_rows, m)
+        A_block = get_block(A, start, end, out=buffer[:end - start])
+        residual = operators.matvec(A_block, x, np.zeros((end - start, x.shape[1]), dtype=out.dtype))
+        residual -= b[start:end]
+        out += operators.rmatvec(A_block, residual, np.zeros(out.shape, dtype=out.dtype))
+    return out
+
+def prepare(rule, sampler):
+    """
+    Calls prepare(sampler) on a step rule and on the rules it wraps (base) that have
+    it, for rules that need the rows being sampled before the first iteration
+    """
+    while (rule is not None):
+        if (hasattr(rule, "prepare")):
+            rule.prepare(sampler)
+        rule = getattr(rule, "base", None)
+
+class ClassicStep:
+    """
+    Step size of classic Linearized Bregman ( ||r||^2 / ||g||^2 )
+    Step rules work column by column on n x K arrays, one column per problem being
+    solved; their state is allocated by setup() before the first iteration, and
+    state names the arrays that carry over between iterations (see checkpoint.py).
+    """
+    adaptive = False
+    state = ()
+
+    def __init__(self, params):
+        pass
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        """
+        Allocates the state of the rule
+        params:
+            shape (tuple): (n, K), the shape of x_k and the gradient
+            lmbda (array-like): 1 x K array of the thresholding parameters
+            dtype (dtype): type of the state (see params.state_dtype)
+        returns: none
+        """
+        # the step size (one per column)
+        self.t_k = np.zeros((1, shape[1]), dtype=dtype)
+
+    def step(self, i, residual, gradient):
+        """
+        Computes the step size for iteration i
+        params:
+            i (int): the current iteration (starting at 1)
+            residual (array-like): the residual ( Ax - b ) of the sampled rows
+            gradient (array-like): the gradient ( A.T * residual )
+        returns:
+            t_k (array-like): the step size, 1 x K or n x K
+            direction (array-like): the direction to step in
+        """
+        np.divide(np.einsum("ij,ij->j", residual, residual),
+                  np.einsum("ij,ij->j", gradient, gradient), out=self.t_k[0])
+        return self.t_k, gradient
+
+class AdagradStep:
+    """
+    Component-wise ADAGRAD step size ( eta/sqrt(s_k + epsilon) )
+    """
+    adaptive = True
+    state = ("s_k",)
+
+    def __init__(self, params):
+        self.eta = params.eta
+        self.epsilon = params.epsilon
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        # the cumulative sum of the squared gradient
+        self.s_k = np.zeros(shape, dtype=dtype)
+        # the step size
+        self.t_k = np.zeros(shape, dtype=dtype)
+
+    def step(self, i, residual, gradient):
+        self.s_k += np.square(gradient, out=self.t_k)
+        np.add(self.s_k, self.epsilon, out=self.t_k)
+        np.sqrt(self.t_k, out=self.t_k)
+        np.divide(self.eta, self.t_k, out=self.t_k)
+        return self.t_k, gradient
+
+class AdamStep:
+    """
+    Component-wise ADAM step size ( eta/(sqrt(v_hat) + epsilon) ), stepping along m_hat
+    """
+    adaptive = True
+    state = ("m_k", "v_k")
+
+    def __init__(self, params):
+        self.eta = params.eta
+        self.epsilon = params.epsilon
+        self.beta_1 = params.beta_1
+        self.beta_2 = params.beta_2
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        # the exponentially moving average of the gradient mean and variance
+        self.m_k = np.zeros(shape, dtype=dtype)
+        self.v_k = np.zeros(shape, dtype=dtype)
+        # bias corrected mean and the step size
+        self.m_hat = np.zeros(shape, dtype=dtype)
+        self.t_k = np.zeros(shape, dtype=dtype)
+
+    def step(self, i, residual, gradient):
+        # ------ UPDATING M AND V ------
+        self.m_k *= self.beta_1
+        self.m_k += np.multiply(1-self.beta_1, gradient, out=self.m_hat)
+        self.v_k *= self.beta_2
+        np.square(gradient, out=self.t_k)
+        self.v_k += np.multiply(1-self.beta_2, self.t_k, out=self.t_k)
+        # bias correction
+        np.divide(self.m_k, 1-self.beta_1**i, out=self.m_hat)
+        np.divide(self.v_k, 1-self.beta_2**i, out=self.t_k)
+
+        # ------ STEP SIZE ------
+        np.sqrt(self.t_k, out=self.t_k)
+        self.t_k += self.epsilon
+        np.divide(self.eta, self.t_k, out=self.t_k)
+        return self.t_k, self.m_hat
+
+class ModifiedStep:
+    """
+    Modified Linearized Bregman step size: scales the step size of another rule
+    component-wise by |tau|/i, where tau counts the sign of the negative gradient.
+    With flipping, only indices of z_k that have crossed the threshold are scaled.
+    """
+    def __init__(self, params, base):
+        self.base = base
+        self.adaptive = base.adaptive
+        self.flipping = params.flipping
+        # (unflagged is rebuilt from m_flag by flip(), which runs before every step)
+        self.state = ("tau", "m_flag") if self.flipping else ("tau",)
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        self.base.setup(shape, lmbda, dtype)
+        self.lmbda = lmbda
+        # step sizes (component-wise array)
+        self.tau = np.zeros(shape, dtype=dtype)
+        self.step_size = np.zeros(shape, dtype=dtype)
+        if (self.flipping):
+            # flags the indices in z_k to apply new step size rule to (once an index
+            # is flagged it stays flagged), and the ones that are not flagged yet
+            self.m_flag = np.zeros(shape, dtype=bool)
+            self.unflagged = np.ones(shape, dtype=bool)
+            # preallocated buffers for |z_k| and the indices above the threshold
+            self.z_abs = np.zeros(shape, dtype=dtype)
+            self.crossed = np.zeros(shape, dtype=bool)
+
+    def flip(self, z_k):
+        """
+        Flags the indices of z_k that are above the threshold
+        params:
+            z_k (array-like): the current value of z
+        returns: none
+        """
+        # finding the indices of z_k that are greater than the threshold
+        np.absolute(z_k, out=self.z_abs)
+        np.greater(self.z_abs, self.lmbda, out=self.crossed)
+        # flagging them, in place
+        self.m_flag |= self.crossed
+        np.logical_not(self.m_flag, out=self.unflagged)
+
+    def step(self, i, residual, gradient):
+        t_k, direction = self.base.step(i, residual, gradient)
+        # getting the component-wise update ( tau + sign(-gradient) )
+        self.tau -= np.sign(gradient, out=self.step_size)
+        # getting the step size
+        np.absolute(self.tau, out=self.step_size)
+        self.step_size *= t_k
+        self.step_size /= i
+        if (self.flipping):
+            # indices that are not flagged keep the unscaled step size
+            np.copyto(self.step_size, t_k, where=self.unflagged)
+        return self.step_size, direction
+
+    @property
+    def t_k(self):
+        # the unscaled step size is the one recorded in the results
+        return self.base.t_k
+
+class VarianceReducedStep:
+    """
+    Corrects the sampled gradient before another rule steps along it, so that its
+    variance vanishes as the iterates converge (with no noise) and the step sizes
+    need not shrink:
+        "svrg": steps along A_sub.T*(A_sub*x_k - A_sub*x_snap) + (num_samp/m) * A.T*(A*x_snap - b),
+                where the snapshot x_snap and its full gradient are refreshed every
+                params.snapshot_every iterations (one pass over the rows by default)
+        "saga": keeps the residual r_j of every row j at its last sample (the gradient of a
+                row is a_j * r_j, so this is an m x K array) and steps along
+                A_sub.T*(r - r_old) + (num_samp/m) * sum_j a_j * r_old_j
+    The rows are those the sampler draws from (see the get_rows() of the samplers).
+    The rows read by the snapshots of SVRG count as passes over the data, both for
+    params.max_passes and in the benchmarks (see snapshots()).
+    """
+    corrected = True
+
+    def __init__(self, params, base, kind):
+        if (kind not in ("svrg", "saga")):
+            raise ValueError("unknown variance reduction: " + str(kind))
+        self.base = base
+        self.adaptive = base.adaptive
+        self.kind = kind
+        self.num_samp = params.num_samp
+        self.every = params.snapshot_every
+        self.state = ("x_snap", "full") if kind == "svrg" else ("memory", "average")
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        self.base.setup(shape, lmbda, dtype)
+        self.shape = shape
+        self.dtype = dtype
+        # preallocated buffers for the residual and the gradient of the correction
+        self.r_sub = np.zeros((self.num_samp, shape[1]), dtype=dtype)
+        self.g_sub = np.zeros(shape, dtype=dtype)
+        if (self.kind == "svrg"):
+            # the snapshot and its full gradient (scaled to num_samp rows)
+            self.x_snap = np.zeros(shape, dtype=dtype)
+            self.full = np.zeros(shape, dtype=dtype)
+        else:
+            # the sum of the remembered gradients of the rows ( sum_j a_j * r_old_j )
+            self.average = np.zeros(shape, dtype=dtype)
+
+    def prepare(self, sampler):
+        self.A, self.b = sampler.get_rows()
+        self.m = self.A.shape[0]
+        if (self.every is None):
+            self.every = max(1, self.m // self.num_samp)
+        if (self.kind == "saga"):
+            self.memory = np.zeros((self.m, self.shape[1]), dtype=self.dtype)
+
+    def correct(self, i, A_sub, b_sub, rows, x_k, residual, gradient):
+        """
+        Replaces the sampled gradient (in place) with its variance reduced estimate
+        params:
+            i (int): the current iteration (starting at 1)
+            A_sub (array-like): the sampled rows of A
+            b_sub (array-like): the corresponding rows of b
+            rows (array-like): the indices of the sampled rows
+            x_k (array-like): the current value of x
+            residual (array-like): the residual ( A_sub*x_k - b_sub )
+            gradient (array-like): the gradient ( A_sub.T * residual )
+        returns: none
+        """
+        scale = self.num_samp / self.m
+        if (self.kind == "svrg"):
+            if ((i - 1) % self.every == 0):
+                # takes a new snapshot (a pass over the rows)
+                self.x_snap[...] = x_k
+                full_gradient(self.A, self.b, self.x_snap, out=self.full)
+                self.full *= scale
+            # subtracts the sampled gradient at the snapshot and adds the full one
+            operators.matvec(A_sub, self.x_snap, out=self.r_sub)
+            self.r_sub -= b_sub
+            operators.rmatvec(A_sub, self.r_sub, out=self.g_sub)
+            gradient -= self.g_sub
+            gradient += self.full
+        else:
+            # the change of the residuals of the sampled rows since they were last sampled
+            np.take(self.memory, rows, axis=0, out=self.r_sub, mode="clip")
+            np.subtract(residual, self.r_sub, out=self.r_sub)
+            operators.rmatvec(A_sub, self.r_sub, out=self.g_sub)
+            np.multiply(self.average, scale, out=gradient)
+            gradient += self.g_sub
+            self.average += self.g_sub
+            self.memory[rows] = residual
+
+    @property
+    def flipping(self):
+        return getattr(self.base, "flipping", False)
+
+    def flip(self, z_k):
+        self.base.flip(z_k)
+
+    def snapshots(self, i):
+        """
+        The number of full gradient snapshots taken in the first i iterations
+        """
+        if (self.kind != "svrg" or i == 0):
+            return 0
+        return (i - 1) // self.every + 1
+
+    def step(self, i, residual, gradient):
+        return self.base.step(i, residual, gradient)
+
+    @property
+    def t_k(self):
+        return self.base.t_k
+
+class AcceleratedStep:
+    """
+    Nesterov (FISTA) momentum on top of another rule: after each step the next
+    residual and gradient are taken at the extrapolated point
+    u_k + (theta_(k-1) - 1)/theta_k * (u_k - u_(k-1)), where u_k is z_k for accelerated
+    Linearized Bregman and x_k for FISTA or for variants without thresholding.
+    With proximal (FISTA), z_k restarts from the extrapolated x_k and is thresholded
+    by t_k * lmbda, so each step is the proximal gradient step
+    x_k = S(x_k - t_k * gradient, t_k * lmbda) (the base rule must not be adaptive).
+    The momentum of a column is reset adaptively (see params.restart) and every
+    params.restart_every iterations: the sampled gradients are noisy, and with
+    momentum that is never reset the iterates build up the noise until they diverge.
+    """
+    accelerated = True
+    state = ("previous", "point", "theta", "last")
+
+    def __init__(self, params, base, proximal=False):
+        if (proximal and base.adaptive):
+            raise ValueError("proximal steps need a step size that is not component-wise")
+        self.base = base
+        self.adaptive = base.adaptive
+        self.proximal = proximal
+        self.restart = params.restart
+        self.restart_every = params.restart_every
+
+    def setup(self, shape, lmbda, dtype=np.float64):
+        self.base.setup(shape, lmbda, dtype)
+        # the last iterate (u_(k-1)) and the point the last step was taken from
+        self.previous = np.zeros(shape, dtype=dtype)
+        self.point = np.zeros(shape, dtype=dtype)
+        # the momentum sequence (one per column)
+        self.theta = np.ones((1, shape[1]), dtype=dtype)
+        # the squared norm of the last residual, and of the current one
+        self.last = np.full((1, shape[1]), np.inf, dtype=dtype)
+        self.norm = np.zeros((1, shape[1]), dtype=dtype)
+        # preallocated buffer for the change of the iterate
+        self.delta = np.zeros(shape, dtype=dtype)
+
+    def step(self, i, residual, gradient):
+        if (self.restart == "residual"):
+            # the residual grew at the extrapolated point, so the next one is not extrapolated
+            np.einsum("ij,ij->j", residual, residual, out=self.norm[0])
+            self.theta[self.norm > self.last] = 1
+            self.last[...] = self.norm
+        return self.base.step(i, residual, gradient)
+
+    def extrapolate(self, i, z_k, x_k, support, lmbda):
+        """
+        Moves z_k and x_k (in place) to the point the next step is taken from
+        params:
+            i (int): the current iteration (starting at 1)
+            z_k (array-like): z after the step
+            x_k (array-like): x after the step
+            support (array-like): boolean array, true where x_k is nonzero
+            lmbda (array-like): 1 x K array of the thresholding parameters, None
+                    for variants without thresholding
+        returns: none
+        """
+        on_z = lmbda is not None and not self.proximal
+        current = z_k if on_z else x_k
+        np.subtract(current, self.previous, out=self.delta)
+        if (self.restart == "gradient"):
+            # the step went against the last change ( (point - u_k).(u_k - u_(k-1)) > 0 )
+            np.subtract(self.point, current, out=self.point)
+            restart = np.einsum("ij,ij->j", self.point, self.delta) > 0
+            self.theta[0, restart] = 1
+        if (self.restart_every is not None and i % self.restart_every == 0):
+            self.theta[...] = 1
+        theta = (1 + np.sqrt(1 + 4 * self.theta**2)) / 2
+        self.delta *= (self.theta - 1) / theta
+        self.theta[...] = theta
+        self.previous[...] = current
+        np.add(current, self.delta, out=self.point)
+        if (on_z):
+            z_k[...] = self.point
+            shrinkage.soft_threshold(z_k, lmbda, out=x_k, support=support)
+        else:
+            x_k[...] = self.point
+            z_k[...] = self.point
+            if (lmbda is not None):
+                np.not_equal(x_k, 0, out=support)
+
+    @property
+    def t_k(self):
+        return self.base.t_k
+
+def get_problem(params, problem=None):
+    """
+    Initializes the Ax = b problem described by params, unless one is given
+    params:
+        params (Params object): contains parameters for optimization
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem;
+                A may be a scipy.sparse matrix, a row_source.RowSource (with b None) to
+                stream its rows or an operators.LinearOperator, and x_true may be None
+                if it is not known
+    returns:
+        A, x_true, b
+    """
+    m = params.m
+    n = params.n
+    sparse = params.sparse
+    noise = params.noise
+    if (problem is not None):
+        return problem
+    dtype = np.dtype(params.dtype)
+    if (params.operator is not None):
+        seed = 0 if params.seed is None else params.seed
+        return init.init_l1_operator(m, n, params.operator, sparse, noise, seed,
+                                     params.operator_nonzeros, dtype)
+    if (params.density is not None):
+        return init.init_l1_sparse(m, n, params.density, sparse, noise, params.seed, dtype)
+    if (params.cache_dir is not None):
+        return problem_cache.load_l1(m, n, sparse, noise, params.seed,
+                                     params.cache_dir, params.cache_max_bytes, dtype)
+    return init.init_l1(m, n, params.num_samp, params.max_iter, sparse, noise, seed=params.seed, dtype=dtype)
+
+def make_rng(params):
+    """
+    The generator a run draws its samples from: seeded with params.sample_seed, or
+    params.seed if that is None (fresh entropy if both are None). Each run has its
+    own generator, so runs in parallel threads or processes do not interfere.
+    """
+    if (params.sample_seed is not None):
+        return np.random.default_rng(params.sample_seed)
+    return np.random.default_rng(params.seed)
+
+def make_results(params, n, x_true):
+    """
+    Creates a Results object that records the history chosen by params.history
+    and the metrics chosen by params.metrics
+    """
+    max_iter = params.max_iter
+    coords = get_results.get_plotted_coords(x_true)
+    recent = None
+    if (params.history_recent > 0):
+        recent = history.RingBuffer(params.history_recent, n)
+    return get_results.Results(max_iter, n, x_true, history.make_history(params, max_iter, n, coords),
+                               recent, params.metrics)
+
+def get_column(t_k, j, adaptive):
+    """
+    The step size of column j, as recorded in its results
+    """
+    if (adaptive):
+        return t_k[:, j:j+1]
+    return t_k[0, j]
+
+def solve(params, rule, thresholding=True, problem=None):
+    """
+    Executes the sample -> residual -> gradient -> step -> threshold loop
+    params:
+        params (Params object): contains parameters for optimization
+        rule (step rule object): computes the step size and direction at each iteration
+        thresholding (bool): true if x_k is the thresholded z_k (Linearized Bregman),
+                false if x_k is updated directly
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem (see get_problem)
+    returns:
+        results (Results object): contains the arrays
+                with the results of the optimization
+    """
+    return solve_lambdas(params, rule, [params.lmbda], thresholding, problem)[0]
+
+def solve_lambdas(params, rule, lmbdas, thresholding=True, problem=None):
+    """
+    Solves the problem for K thresholding parameters at once. x_k and z_k are kept as
+    the columns of n x K arrays and every column sees the same samples, so each
+    iteration costs one matrix-matrix product with A_sub and one with A_sub.T
+    instead of K matrix-vector products.
+    params:
+        params (Params object): contains parameters for optimization
+        rule (step rule object): computes the step size and direction at each iteration
+        lmbdas (array-like): the K thresholding parameters
+        thresholding (bool): true if x_k is the thresholded z_k (Linearized Bregman),
+                false if x_k is updated directly
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem (see get_problem)
+    returns:
+        results (list): a Results object for each thresholding parameter
+    """
+    return solve_lockstep(params, [(rule, thresholding, lmbdas)], problem)[0]
+
+def solve_lockstep(params, variants, problem=None):
+    """
+    Runs several algorithm variants in lockstep on the same problem. Every variant
+    sees the same minibatches: the columns of all the variants are stacked into one
+    n x K array, so each iteration draws one sample and computes every residual and
+    gradient with one matrix-matrix product, then applies each variant's own step
+    rule to its columns.
+    params:
+        params (Params object): contains parameters for optimization
+        variants (list): (rule, thresholding, lmbdas) for each variant, where rule is
+                its step rule object, thresholding is true if x_k is the thresholded z_k
+                and lmbdas are its thresholding parameters (one column each)
+        problem (tuple): (A, x_true, b) to solve instead of generating a problem (see get_problem)
+    With params.profile, the time spent in each phase of the loop is recorded in a
+    profiler.Profiler that is attached to the results (as profile).
+    Each column stops on its own once it meets one of the stopping criteria in params
+    (its results are no longer updated), and the run ends when every column has
+    stopped, when it runs out of its time or data-pass budget, or after max_iter
+    iterations. The results are truncated to the iterations each column ran, and
+    their stop_reason says why it stopped.
+    returns:
+        results (list): for each variant, a list with a Results object per thresholding parameter
+    """
+    # ------ PARAMETERS ------
+    n = params.n
+    num_samp = params.num_samp
+    max_iter = params.max_iter
+    # ------------------------
+    # initializes the Ax = b problem
+    A, x_true, b = get_problem(params, problem)
+
+    # columns of the stacked arrays that belong to each variant
+    groups = []
+    K = 0
+    for rule, thresholding, lmbdas in variants:
+        lmbda = np.array(lmbdas, dtype=float).reshape(1, -1)
+        groups.append((rule, thresholding, lmbda, slice(K, K + lmbda.shape[1])))
+        K += lmbda.shape[1]
+
+    # x_k and the products with A are in the type of A; z_k and the state of the
+    # step rules may be kept in a wider type (see params.state_dtype)
+    dtype = np.dtype(A.dtype)
+    state_dtype = dtype if params.state_dtype is None else np.dtype(params.state_dtype)
+
+    # current values of x and z (one column per variant and thresholding parameter)
+    x_k = np.zeros((n, K), dtype=dtype)
+    z_k = np.zeros((n, K), dtype=state_dtype)
+
+    # the generator the samples are drawn from
+    rng = make_rng(params)
+
+    # the checkpoint to resume from, if any (see checkpoint.py)
+    saved = None
+    if (params.checkpoint_dir is not None):
+        if (params.prefetch):
+            raise ValueError("checkpoints do not support prefetching")
+        if (params.resume):
+            saved = checkpoint.load_latest(params.checkpoint_dir)
+        if (saved is not None):
+            # draws the same samples as the run that saved it (for samplers that draw
+            # when they are created)
+            rng.bit_generator.state = saved[1]["sampler_rng"]
+        sampler_rng = rng.bit_generator.state
+
+    # chooses the rows of A and b at each iteration
+    sampler = sampling.make_sampler(params, A, b, rng)
+
+    # preallocated buffers for the residual and the gradient
+    residual = np.zeros((num_samp, K), dtype=dtype)
+    # preallocated buffers for the active columns of A_sub and rows of x_k
+    max_active = int(params.active_set_density * n)
+    active_buffers = (np.zeros(num_samp * max_active, dtype=dtype), np.zeros(max_active * K, dtype=dtype))
+    gradient = np.zeros((n, K), dtype=dtype)
+    update = np.zeros((n, K), dtype=state_dtype)
+    # where x_k is nonzero, kept up to date by the thresholding
+    support = np.zeros((n, K), dtype=bool)
+
+    results = []
+    thresholded = []
+    for rule, thresholding, lmbda, cols in groups:
+        rule.setup((n, lmbda.shape[1]), lmbda, state_dtype)
+        prepare(rule, sampler)
+        if (not thresholding):
+            # x_k is not thresholded, so it is treated as dense
+            support[:, cols] = True
+        # creates a Results object for each column to hold and update results
+        results.append([make_results(params, n, x_true) for j in range(lmbda.shape[1])])
+        thresholded += [thresholding] * lmbda.shape[1]
+    columns = [result for group_results in results for result in group_results]
+
+    # decides when each column stops
+    stopper = stopping.Stopper(params, thresholded, A.shape[0] if b is not None else getattr(A, "m", None))
+    # relative change of z_k (x_k without thresholding) at the current iteration
+    change = np.zeros(K)
+
+    # times the phases of each iteration (does nothing unless params.profile is set)
+    profile = profiler.make_profiler(params)
+
+    # ------ CHECKPOINTS ------
+    start = 1
+    if (saved is not None):
+        arrays, state = saved
+        if (state["max_iter"] != max_iter):
+            raise ValueError("a run can only be resumed with the same max_iter")
+        checkpoint.restore({"x_k": x_k, "z_k": z_k, "support": support}, arrays)
+        for g, (rule, thresholding, lmbda, cols) in enumerate(groups):
+            checkpoint.set_state(rule, arrays, "rule" + str(g) + ".")
+        for name, value in state["sampler"].items():
+            setattr(sampler, name, value)
+        results = state["results"]
+        columns = [result for group_results in results for result in group_results]
+        stopper.criteria = state["criteria"]
+        stopper.stopped = state["stopped"]
+        stopper.reasons = state["reasons"]
+        # (checkpoints saved before the elapsed time was recorded restart the budget)
+        stopper.resume(state.get("elapsed", 0.0))
+        rng.bit_generator.state = state["rng"]
+        start = state["i"] + 1
+        if (stopper.stopped.all()):
+            start = max_iter + 1
+    elif (params.warm_start is not None):
+        checkpoint.warm_start(params.warm_start, groups, x_k, z_k, support)
+    saver = None
+    if (params.checkpoint_dir is not None):
+        saver = checkpoint.Checkpointer(params.checkpoint_dir)
+    def save(i):
+        arrays = {"x_k": x_k, "z_k": z_k, "support": support}
+        for g, (rule, thresholding, lmbda, cols) in enumerate(groups):
+            arrays.update(checkpoint.get_state(rule, "rule" + str(g) + "."))
+        saver.save(i, arrays, {
+            "i": i,
+            "max_iter": max_iter,
+            "rng": rng.bit_generator.state,
+            "sampler_rng": sampler_rng,
+            "sampler": {name: getattr(sampler, name) for name in sampler.state},
+            "results": results,
+            "criteria": stopper.criteria,
+            "stopped": stopper.stopped,
+            "reasons": stopper.reasons,
+            "elapsed": stopper.elapsed(),
+        })
+
+    # ------ MAIN LOOP ------
+    i = start - 1
+    for i in range(start, max_iter+1):
+        if (params.verbose):
+            print("iteration: " + str(i))
+        profile.begin(i)
+
+        # ------ SAMPLING ------
+        A_sub, b_sub = sampler.sample()
+        profile.mark("sampling")
+
+        # ------ RESIDUAL AND GRADIENT ------
+        # gets the residual ( Ax - b )
+        residual_matvec(A_sub, x_k, support, params.active_set_density, out=residual,
+                        buffers=active_buffers)
+        residual -= b_sub
+        profile.mark("residual")
+        # gets the gradient ( A.T * residual )
+        operators.rmatvec(A_sub, residual, out=gradient)
+        profile.mark("gradient")
+
+        for (rule, thresholding, lmbda, cols), group_results in zip(groups, results):
+            # ------ VARIANCE REDUCTION ------
+            if (getattr(rule, "corrected", False)):
+                rule.correct(i, A_sub, b_sub, sampler.last_rows, x_k[:, cols], residual[:, cols],
+                             gradient[:, cols])
+                # the rows read by the snapshots count against params.max_passes
+                stopper.extra_rows[cols] = rule.snapshots(i) * rule.m
+                profile.mark("correction")
+
+            # ------ FLIPPING ------
+            if (getattr(rule, "flipping", False)):
+                rule.flip(z_k[:, cols])
+                profile.mark("flipping")
+
+            # ------ STEP SIZE ------
+            step_size, direction = rule.step(i, residual[:, cols], gradient[:, cols])
+            profile.mark("step")
+
+            # ------ UPDATING X AND Z ------
+            np.multiply(step_size, direction, out=update[:, cols])
+            if (thresholding):
+                # z_k -= update and x_k = S(z_k), in one pass
+                threshold = lmbda
+                if (getattr(rule, "proximal", False)):
+                    threshold = lmbda * rule.t_k
+                shrinkage.update_threshold(z_k[:, cols], update[:, cols], threshold,
+                                           out=x_k[:, cols], support=support[:, cols])
+                profile.mark("threshold")
+            else:
+                x_k[:, cols] -= update[:, cols]
+                profile.mark("update")
+            if (stopper.needs_change):
+                current = z_k[:, cols] if thresholding else x_k[:, cols]
+                np.divide(np.linalg.norm(update[:, cols], axis=0),
+                          np.linalg.norm(current, axis=0), out=change[cols])
+
+            # ------ RESULTS ------
+            for j, result in enumerate(group_results):
+                c = cols.start + j
+                if (not stopper.stopped[c]):
+                    result.update(residual[:, c:c+1], b_sub, n, x_k[:, c:c+1], z_k[:, c:c+1],
+                                  get_column(rule.t_k, j, rule.adaptive), adaptive=rule.adaptive)
+            profile.mark("results")
+
+            # ------ EXTRAPOLATION ------
+            if (getattr(rule, "accelerated", False)):
+                rule.extrapolate(i, z_k[:, cols], x_k[:, cols], support[:, cols],
+                                 lmbda if thresholding else None)
+                profile.mark("extrapolation")
+
+        # ------ STOPPING ------
+        done = stopper.check(i, change, support, columns)
+        profile.mark("stopping")
+        if (done):
+            break
+        if (saver is not None and i % params.checkpoint_every == 0 and i < max_iter):
+            save(i)
+            profile.mark("checkpoint")
+
+    if (hasattr(sampler, "close")):
+        sampler.close()
+    if (saver is not None):
+        # the final state, to resume or warm start from
+        save(i)
+        saver.close()
+
+    for (rule, thresholding, lmbda, cols), group_results in zip(groups, results):
+        if (hasattr(rule, "snapshots")):
+            for result in group_results:
+                result.snapshots = rule.snapshots(result.i)
+                result.snapshot_rows = result.snapshots * rule.m
+
+    for result, reason in zip(columns, stopper.reasons):
+        result.truncate()
+        result.finish()
+        result.stop_reason = reason
+        if (params.profile):
+            result.profile = profile
+        if (params.verbose):
+            print("stopped after " + str(result.i) + " iterations: " + reason)
+
+    return results
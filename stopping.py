@@ -0,0 +1,161 @@
+"""
+Stopping criteria for the optimization algorithms
+@authors: Jimmy Singh and Janice Lee
+@date: July 17th, 2019
+"""
+import time
+
+import numpy as np
+
+class RelativeChange:
+    """
+    Stops a column once ||z_k - z_(k-1)|| / ||z_k|| is below tol
+    (x_k for variants without thresholding)
+    """
+    name = "relative-change"
+    needs_change = True
+
+    def __init__(self, tol):
+        self.tol = tol
+
+    def check(self, i, change, support, results):
+        return change < self.tol
+
+class ResidualPlateau:
+    """
+    Stops a column once the mean residual over the last window values is less than
+    tol (relatively) below the mean over the window before it (the residual must be
+    one of the metrics computed every k iterations, see params.metrics)
+    """
+    name = "residual-plateau"
+    needs_change = False
+
+    def __init__(self, window, tol):
+        self.window = window
+        self.tol = tol
+
+    def check(self, i, change, support, results):
+        met = np.zeros(len(results), dtype=bool)
+        for j, result in enumerate(results):
+            residuals = result.residuals
+            k = len(residuals)
+            if (k >= 2 * self.window):
+                last = np.mean(residuals[k-self.window:k])
+                before = np.mean(residuals[k-2*self.window:k-self.window])
+                met[j] = before - last < self.tol * before
+        return met
+
+class SupportStable:
+    """
+    Stops a column once the (nonempty) support of x_k has not changed for window
+    iterations (only for variants with thresholding)
+    """
+    name = "support-stable"
+    needs_change = False
+
+    def __init__(self, window, thresholded):
+        self.window = window
+        self.thresholded = thresholded
+        self.previous = None
+        self.count = np.zeros(len(thresholded), dtype=int)
+
+    def check(self, i, change, support, results):
+        if (self.previous is None):
+            self.previous = support.copy()
+            return np.zeros(len(self.count), dtype=bool)
+        # an empty support (before z_k first crosses the threshold) does not count
+        same = np.all(support == self.previous, axis=0) & support.any(axis=0)
+        self.count = np.where(same, self.count + 1, 0)
+        self.previous[...] = support
+        return self.thresholded & (self.count >= self.window)
+
+class Target:
+    """
+    Stops a column once the last value of a metric (one computed every k iterations,
+    see params.metrics) is at most target
+    """
+    needs_change = False
+
+    def __init__(self, metric, target):
+        self.metric = metric
+        self.target = target
+        self.name = metric + "-target"
+
+    def check(self, i, change, support, results):
+        met = np.zeros(len(results), dtype=bool)
+        for j, result in enumerate(results):
+            values = result.get_metric(self.metric)
+            met[j] = len(values) > 0 and values[-1] <= self.target
+        return met
+
+class Stopper:
+    """
+    Decides when each column of a run stops, and when the whole run stops
+    params:
+        params (Params object): contains the stopping parameters
+        thresholded (array-like): for each column, true if its x_k is thresholded
+        m (int): rows of A, to count passes over the data (None if not known)
+    """
+    def __init__(self, params, thresholded, m):
+        K = len(thresholded)
+        self.criteria = []
+        if (params.stop_rel_change is not None):
+            self.criteria.append(RelativeChange(params.stop_rel_change))
+        if (params.stop_plateau_window is not None):
+            self.criteria.append(ResidualPlateau(params.stop_plateau_window, params.stop_plateau_tol))
+        if (params.stop_moder is not None):
+            self.criteria.append(Target("moder", params.stop_moder))
+        if (params.stop_residual is not None):
+            self.criteria.append(Target("residual", params.stop_residual))
+        if (params.stop_support_window is not None):
+            self.criteria.append(SupportStable(params.stop_support_window, np.array(thresholded)))
+        self.needs_change = any(criterion.needs_change for criterion in self.criteria)
+        self.max_seconds = params.max_seconds
+        self.max_passes = params.max_passes
+        if (self.max_passes is not None and m is None):
+            raise ValueError("max_passes needs the number of rows of A")
+        self.rows_per_iter = params.num_samp
+        self.m = m
+        # rows of A each column has read besides its samples (the snapshots of SVRG),
+        # kept up to date by the solver
+        self.extra_rows = np.zeros(K)
+        self.start = time.perf_counter()
+        self.stopped = np.zeros(K, dtype=bool)
+        self.reasons = ["max-iter"] * K
+
+    def elapsed(self):
+        """
+        The seconds the run has taken, counted against max_seconds
+        """
+        return time.perf_counter() - self.start
+
+    def resume(self, elapsed):
+        """
+        Continues the time budget of a resumed run that had already taken elapsed seconds
+        """
+        self.start = time.perf_counter() - elapsed
+
+    def stop(self, columns, reason):
+        for j in np.flatnonzero(columns & ~self.stopped):
+            self.reasons[j] = reason
+        self.stopped |= columns
+
+    def check(self, i, change, support, results):
+        """
+        Checks the stopping criteria after iteration i
+        params:
+            i (int): the current iteration
+            change (array-like): relative change of z_k for each column
+            support (array-like): n x K boolean array, true where x_k is nonzero
+            results (list): the Results object of each column
+        returns:
+            true if every column has stopped
+        """
+        for criterion in self.criteria:
+            self.stop(criterion.check(i, change, support, results), criterion.name)
+        if (self.max_seconds is not None and self.elapsed() >= self.max_seconds):
+            self.stop(np.ones(len(self.stopped), dtype=bool), "max-seconds")
+        if (self.max_passes is not None):
+            rows = i * self.rows_per_iter + self.extra_rows
+            self.stop(rows >= self.max_passes * self.m, "max-passes")
+        return self.stopped.all()
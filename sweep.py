@@ -0,0 +1,202 @@
+"""
+Runs parameter sweeps in a pool of processes that share A and b through shared memory
+@authors: Jimmy Singh and Janice Lee
+@date: July 15th, 2019
+"""
+import copy
+import itertools
+import multiprocessing as mp
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import solver
+from lb_classic import lb_classic
+from lb_modified import lb_modified
+from adagrad import adagrad
+from adagrad_lb_classic import adagrad_lb_classic
+from adagrad_lb_modified import adagrad_lb_modified
+from adam import adam
+from adam_lb_classic import adam_lb_classic
+from adam_lb_modified import adam_lb_modified
+from accelerated_lb import accelerated_lb
+from fista import fista
+from svrg_lb_classic import svrg_lb_classic
+from svrg_lb_modified import svrg_lb_modified
+from saga_lb_classic import saga_lb_classic
+from saga_lb_modified import saga_lb_modified
+
+ALGORITHMS = {
+    "lb-classic": lb_classic,
+    "lb-modified": lb_modified,
+    "adagrad": adagrad,
+    "adagrad-lb-classic": adagrad_lb_classic,
+    "adagrad-lb-modified": adagrad_lb_modified,
+    "adam": adam,
+    "adam-lb-classic": adam_lb_classic,
+    "adam-lb-modified": adam_lb_modified,
+    "accelerated-lb": accelerated_lb,
+    "fista": fista,
+    "svrg-lb-classic": svrg_lb_classic,
+    "svrg-lb-modified": svrg_lb_modified,
+    "saga-lb-classic": saga_lb_classic,
+    "saga-lb-modified": saga_lb_modified,
+}
+
+# the scenarios in the run.py docstring, as (sparse, noise)
+SCENARIOS = [(True, False), (True, True), (False, False), (False, True)]
+
+# parameters that change the problem itself rather than how it is solved
+PROBLEM_PARAMS = ("m", "n", "sparse", "noise", "seed", "dtype")
+
+# environment variables that set the number of threads used by BLAS
+BLAS_THREADS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                "BLIS_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+def expand(grid):
+    """
+    Expands a grid of parameter values into the list of all their combinations
+    params:
+        grid (dict): parameter name -> list of values
+                ("scenario" can be used for (sparse, noise) pairs such as SCENARIOS)
+    returns:
+        a list of dicts of parameter name -> value
+    """
+    names = list(grid.keys())
+    points = []
+    for values in itertools.product(*[grid[name] for name in names]):
+        point = dict(zip(names, values))
+        if ("scenario" in point):
+            point["sparse"], point["noise"] = point.pop("scenario")
+        points.append(point)
+    return points
+
+def get_params(base, point):
+    """
+    Copies base with the parameters of one point of the grid
+    """
+    params = copy.copy(base)
+    for name, value in point.items():
+        setattr(params, name, value)
+    return params
+
+def share(array):
+    """
+    Copies an array into a new shared memory block
+    returns:
+        the SharedMemory block and (name, shape, dtype) to attach to it
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+# shared memory blocks this worker is attached to, by name
+attached = {}
+
+def attach(descs):
+    """
+    Read-only views of the shared arrays of a problem in a worker, attaching to
+    their blocks once per problem
+    params:
+        descs (list): (name, shape, dtype) of each array
+    returns:
+        a list of the arrays
+    """
+    names = [name for name, _, _ in descs]
+    # only the blocks of the current problem are kept
+    for name in list(attached.keys()):
+        if (name not in names):
+            attached.pop(name).close()
+    arrays = []
+    for name, shape, dtype in descs:
+        if (name not in attached):
+            if (sys.version_info >= (3, 13)):
+                attached[name] = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                attached[name] = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=attached[name].buf)
+        array.flags.writeable = False
+        arrays.append(array)
+    return arrays
+
+def init_worker(blas_threads):
+    """
+    Limits each worker to blas_threads BLAS threads so the pool does not oversubscribe the cores
+    """
+    try:
+        import threadpoolctl
+        threadpoolctl.threadpool_limits(blas_threads)
+    except ImportError:
+        pass
+
+def run_job(job):
+    """
+    Runs one algorithm on one point of the grid in a worker
+    """
+    algorithm, point, base, A_desc, x_true, b_desc = job
+    params = get_params(base, point)
+    params.verbose = False
+    A, b = attach([A_desc, b_desc])
+    problem = (A, x_true, b)
+    return algorithm, point, ALGORITHMS[algorithm](params, problem=problem)
+
+def sweep(base, grid, algorithms, processes=None, blas_threads=1):
+    """
+    Runs every algorithm on every point of the grid in a pool of processes and yields
+    the results as they finish. Each problem (a combination of m, n, sparse, noise
+    and seed) is generated once and placed in shared memory, so the workers never
+    copy or pickle A. A must be stored (not a matrix-free operator or a row source).
+    params:
+        base (Params object): the parameters not set by the grid
+        grid (dict): parameter name -> list of values (see expand)
+        algorithms (list): names of algorithms in ALGORITHMS to run
+        processes (int): number of worker processes (defaults to the number of cores)
+        blas_threads (int): BLAS threads per worker
+    returns:
+        a generator of (algorithm, point, results) tuples
+    """
+    points = expand(grid)
+    # groups the points by the problem they solve
+    problems = {}
+    for point in points:
+        params = get_params(base, point)
+        if (params.seed is None):
+            params.seed = 0
+            point["seed"] = 0
+        key = tuple(getattr(params, name) for name in PROBLEM_PARAMS)
+        problems.setdefault(key, []).append(point)
+
+    # workers started with these variables set use blas_threads BLAS threads,
+    # even without threadpoolctl
+    saved = {name: os.environ.get(name) for name in BLAS_THREADS}
+    os.environ.update({name: str(blas_threads) for name in BLAS_THREADS})
+    try:
+        pool = mp.get_context("spawn").Pool(processes, init_worker, (blas_threads,))
+    finally:
+        for name, value in saved.items():
+            if (value is None):
+                del os.environ[name]
+            else:
+                os.environ[name] = value
+
+    with pool:
+        for key, problem_points in problems.items():
+            params = get_params(base, problem_points[0])
+            A, x_true, b = solver.get_problem(params)
+            if (not isinstance(A, np.ndarray)):
+                raise ValueError("sweep needs a dense A to share")
+            A_shm, A_desc = share(A)
+            b_shm, b_desc = share(b)
+            del A, b
+            try:
+                jobs = [(algorithm, point, base, A_desc, x_true, b_desc)
+                        for point in problem_points for algorithm in algorithms]
+                for result in pool.imap_unordered(run_job, jobs):
+                    yield result
+            finally:
+                A_shm.close()
+                A_shm.unlink()
+                b_shm.close()
+                b_shm.unlink()
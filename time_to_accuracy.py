@@ -0,0 +1,170 @@
+"""
+Measures the cost of each algorithm to reach a target model error or residual:
+wall time, iterations, passes over the data and FLOPs, over several seeds
+@authors: Jimmy Singh and Janice Lee
+@date: July 22nd, 2019
+"""
+import copy
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+plt.style.use('seaborn-poster')
+plt.style.use('ggplot')
+
+import set_params
+import solver
+import profiler
+from benchmark import BENCHMARKS, run_algorithm
+
+# flops per coordinate of x for the vector work of an iteration (step size, update
+# and thresholding), on top of the two products with A_sub
+VECTOR_FLOPS = 10
+
+# products with A_sub or A_sub.T per iteration of the variance reduced algorithms, on
+# top of the two of the gradient (see solver.VarianceReducedStep)
+EXTRA_PRODUCTS = {"svrg": 2, "saga": 1}
+
+def get_flops(n, num_samp, iterations, extra_products=0, snapshot_rows=0):
+    """
+    Estimated flops of a run: each iteration multiplies A_sub and A_sub.T with a vector
+    (2 * num_samp * n flops each, without the active set) plus O(n) vector work, the
+    variance reduced algorithms make extra_products more products with A_sub, and the
+    snapshots of SVRG multiply snapshot_rows rows of A and A.T with a vector
+    """
+    return (iterations * ((4 + 2 * extra_products) * num_samp * n + VECTOR_FLOPS * n)
+            + 4 * snapshot_rows * n)
+
+def run_to_target(algorithm, params, seed, metric, target):
+    """
+    Runs one algorithm on the problem drawn with seed until metric ("moder" or
+    "residual") is at most target, or for params.max_iter iterations
+    returns:
+        a dict with the cost of the run and its error at each iteration
+    """
+    params = copy.copy(params)
+    params.seed = seed
+    params.sample_seed = seed
+    params.stop_moder = target if metric == "moder" else None
+    params.stop_residual = target if metric == "residual" else None
+    problem = solver.get_problem(params)
+
+    # times each iteration for the error curve
+    profile = profiler.Profiler(params.max_iter)
+    start = time.perf_counter()
+    results = run_algorithm(algorithm, params, problem, profile)
+    seconds = time.perf_counter() - start
+
+    snapshot_rows = 0
+    if (algorithm == "ista"):
+        residuals, _, moder = results
+    else:
+        residuals, moder = results.residuals, results.moder
+        snapshot_rows = results.snapshot_rows
+    errors = moder if metric == "moder" else residuals
+    iterations = len(errors)
+    times = np.cumsum(sum(profile.get_per_iteration(phase) for phase in profile.per_iteration))
+    return {
+        "algorithm": algorithm,
+        "seed": seed,
+        "reached": bool(iterations > 0 and errors[-1] <= target),
+        "seconds": seconds,
+        "iterations": iterations,
+        "passes": (iterations * params.num_samp + snapshot_rows) / params.m,
+        "flops": get_flops(params.n, params.num_samp, iterations,
+                           EXTRA_PRODUCTS.get(algorithm.split("-")[0], 0), snapshot_rows),
+        "errors": errors,
+        "times": times[:iterations],
+    }
+
+def time_to_accuracy(params, algorithms=BENCHMARKS, seeds=range(5), metric="moder", target=0.1):
+    """
+    Runs every algorithm on the problem of every seed until it reaches the target
+    params:
+        params (Params object): the problem and the parameters of the algorithms
+                (max_iter caps the runs that never reach the target)
+        algorithms (list): names of algorithms in benchmark.BENCHMARKS
+        seeds (list): seeds to draw the problems and samples with
+        metric (str): "moder" or "residual"
+        target (float): the error to reach
+    returns:
+        a list with a dict per run (see run_to_target)
+    """
+    params = copy.copy(params)
+    params.verbose = False
+    runs = []
+    for seed in seeds:
+        for algorithm in algorithms:
+            runs.append(run_to_target(algorithm, params, seed, metric, target))
+    return runs
+
+def rank(runs):
+    """
+    Ranks the algorithms by the median time to reach the target, counting the runs
+    that never reach it as infinitely slow
+    returns:
+        a list with a dict per algorithm, fastest first
+    """
+    rows = []
+    for algorithm in sorted(set(run["algorithm"] for run in runs)):
+        algorithm_runs = [run for run in runs if run["algorithm"] == algorithm]
+        reached = [run for run in algorithm_runs if run["reached"]]
+        def median(name):
+            values = [run[name] if run["reached"] else np.inf for run in algorithm_runs]
+            return float(np.median(values))
+        rows.append({
+            "algorithm": algorithm,
+            "reached": len(reached),
+            "runs": len(algorithm_runs),
+            "seconds": median("seconds"),
+            "iterations": median("iterations"),
+            "passes": median("passes"),
+            "flops": median("flops"),
+        })
+    rows.sort(key=lambda row: (row["seconds"], -row["reached"]))
+    return rows
+
+def print_table(rows, metric, target):
+    print("time to " + metric + " <= " + str(target) + " (medians over seeds)")
+    print("%-4s %-32s %8s %10s %10s %8s %10s" % ("rank", "algorithm", "reached", "seconds",
+                                                 "iters", "passes", "GFLOPs"))
+    for k, row in enumerate(rows):
+        print("%-4d %-32s %4d/%-3d %10.3f %10.0f %8.2f %10.3f" % (
+            k+1, row["algorithm"], row["reached"], row["runs"], row["seconds"],
+            row["iterations"], row["passes"], row["flops"] / 1e9))
+
+def plot_time_vs_error(runs, metric, target, path, seed=0):
+    """
+    Plots the error of each algorithm against wall time for the runs of one seed
+    """
+    plt.clf()
+    legend = []
+    for run in runs:
+        if (run["seed"] == seed):
+            plt.semilogy(run["times"], run["errors"])
+            legend.append(run["algorithm"])
+    plt.axhline(y=target, linestyle="--", color="0.5")
+    plt.xlabel("Wall time (s)", size=20)
+    if (metric == "moder"):
+        plt.ylabel("Model error " + r"$\frac{||x^*-x||_{2}}{||x^*||_{2}}$", size=20)
+    else:
+        plt.ylabel("Residual " + r"$\frac{||Ax-b||_{2}}{||b||_2}$", size=20)
+    plt.legend(legend, fontsize=10)
+    plt.savefig(path)
+
+def main():
+    # ------ CONFIGURE PARAMETERS ------
+    params = set_params.Params()
+    params.max_iter = 2000
+    params.sparse = True
+    params.noise = False
+    metric = "moder"
+    target = 0.1
+    seeds = range(5)
+    # ------ EXECUTE ------
+    runs = time_to_accuracy(params, BENCHMARKS, seeds, metric, target)
+    print_table(rank(runs), metric, target)
+    plot_time_vs_error(runs, metric, target, "plots/_compare/time-vs-" + metric + ".png", seeds[0])
+
+if __name__ == "__main__":
+    main()